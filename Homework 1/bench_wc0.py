@@ -0,0 +1,188 @@
+#!/usr/bin/env python3 -B
+"""
+Benchmarks for the wc0_fixed performance modes.
+Usage: python3 bench_wc0.py [name ...]   (default: every benchmark)
+Each benchmark prints a small table and verifies results against the
+reference generator pipeline before reporting any numbers.
+"""
+
+import os
+import sys
+import time
+import socket
+import tempfile
+import subprocess
+import threading
+import socketserver
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Any
+import wc0_fixed
+import wc_async
+
+BENCH: Dict[str, Any] = {
+    "seed_file": "essay.txt",
+    "size_mb": 16,
+    "repeats": 3,
+    # Stand-in producer for the async benchmark: each of `sources`
+    # connections streams `source_kb` of text in 16 KB writes, pausing
+    # `producer_delay` seconds between writes like a slow upstream.
+    "sources": 64,
+    "source_kb": 256,
+    "producer_delay": 0.002,
+    # Startup benchmark: fresh interpreters per scenario (best of N).
+    "startup_runs": 10,
+}
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+
+def make_corpus(path: str, size_mb: int) -> None:
+    """Writes a synthetic corpus by repeating the seed essay."""
+    with open(BENCH["seed_file"], encoding="utf-8") as f:
+        seed = f.read()
+    copies = size_mb * (1 << 20) // len(seed.encode("utf-8")) + 1
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(seed * copies)
+
+
+def raw_word_count(path: str) -> int:
+    """Counts whitespace tokens (the unit for words/sec)."""
+    with open(path, encoding="utf-8") as f:
+        return sum(len(line.split()) for line in f)
+
+
+def best_time(fn: Callable[[], Any], repeats: int) -> float:
+    """Returns the fastest wall time of several runs."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def read_prefix(path: str, size: int) -> bytes:
+    """First ~size bytes of a file, cut after a newline."""
+    with open(path, "rb") as f:
+        return f.read(size) + f.readline()
+
+
+class SlowProducer(socketserver.StreamRequestHandler):
+    """Writes the server's payload in small, delayed pieces."""
+
+    def handle(self) -> None:
+        payload = self.server.payload
+        for start in range(0, len(payload), 1 << 14):
+            self.wfile.write(payload[start:start + (1 << 14)])
+            time.sleep(BENCH["producer_delay"])
+
+
+class ProducerServer(socketserver.ThreadingUnixStreamServer):
+    """Threaded producer with a listen backlog deep enough for every source."""
+    request_queue_size = 1024
+
+
+@contextmanager
+def producer_socket(tmp: str, payload: bytes) -> Iterator[str]:
+    """Runs a threaded Unix-socket producer; yields its path."""
+    path = os.path.join(tmp, "producer.sock")
+    with ProducerServer(path, SlowProducer) as server:
+        server.payload = payload
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        yield path
+        server.shutdown()
+
+
+def stream_socket_lines(path: str) -> Iterator[str]:
+    """Sync reference source: blocking reads from a Unix socket."""
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.connect(path)
+        with sock.makefile("r", encoding="utf-8") as f:
+            yield from f
+
+
+def count_sockets_sync(paths: List[str]) -> Dict[str, int]:
+    """The sync pipeline, reading one source after another."""
+    lines = (line for p in paths for line in stream_socket_lines(p))
+    return wc0_fixed.count_from_stream(
+        wc0_fixed.stream_filter(wc0_fixed.stream_words(lines)))
+
+
+def report(label: str, seconds: float, words: int) -> None:
+    print(f"  {label:12} {seconds:8.3f}s {words / seconds:14,.0f} words/sec")
+
+# =============================================================================
+# BENCHMARKS
+# =============================================================================
+
+
+def bench_engines(path: str) -> None:
+    """Generator pipeline vs memory-mapped batched engine on one file."""
+    words = raw_word_count(path)
+    print(f"engines: {os.path.getsize(path) >> 20} MB, {words:,} words")
+    results = {}
+    for engine in ("generator", "mmap"):
+        wc0_fixed.CONFIG["engine"] = engine
+        results[engine] = wc0_fixed.count_file(path)
+        report(engine, best_time(lambda: wc0_fixed.count_file(path),
+                                 BENCH["repeats"]), words)
+    wc0_fixed.CONFIG["engine"] = "generator"
+    assert list(results["mmap"].items()) == list(results["generator"].items())
+
+
+def bench_async(path: str) -> None:
+    """Sync sequential reads vs asyncio concurrent reads of slow sockets."""
+    payload = read_prefix(path, BENCH["source_kb"] << 10)
+    words = len(payload.split()) * BENCH["sources"]
+    print(f"async: {BENCH['sources']} socket sources x {len(payload) >> 10} KB")
+    with tempfile.TemporaryDirectory() as tmp, producer_socket(tmp, payload) as sock:
+        paths = [sock] * BENCH["sources"]
+        sources = [f"unix:{sock}"] * BENCH["sources"]
+        expected = count_sockets_sync(paths)
+        assert wc_async.count_sources(sources) == expected
+        report("sync", best_time(lambda: count_sockets_sync(paths), 1), words)
+        report("asyncio", best_time(lambda: wc_async.count_sources(sources), 1), words)
+
+
+def startup_time(code: str) -> float:
+    """Best wall time of a fresh interpreter running `code`."""
+    argv = [sys.executable, "-c", code]
+    return best_time(lambda: subprocess.run(argv, check=True, stderr=subprocess.DEVNULL),
+                     BENCH["startup_runs"])
+
+
+def bench_startup(_path: str) -> None:
+    """Interpreter + import + policy load: lazy import, cold vs cached policy."""
+    flags = "wc0_fixed.CONFIG.update(load_external_stopwords=True, policy_cache=%r)"
+    load = f"import wc0_fixed; {flags}; wc0_fixed.ensure_policy()"
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, "policy.cache")
+        rows = [("python", "pass"), ("import", "import wc0_fixed"),
+                ("parse", load % None), ("cached", load % cache)]
+        subprocess.run([sys.executable, "-c", load % cache], check=True,
+                       stderr=subprocess.DEVNULL)
+        print("startup: best of", BENCH["startup_runs"], "fresh interpreters")
+        for label, code in rows:
+            print(f"  {label:12} {startup_time(code) * 1000:8.1f} ms")
+
+
+BENCHMARKS: Dict[str, Callable[[str], None]] = {
+    "engines": bench_engines,
+    "async": bench_async,
+    "startup": bench_startup,
+}
+
+
+def main(names: list) -> None:
+    """Builds one synthetic corpus and runs the selected benchmarks on it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.txt")
+        make_corpus(path, BENCH["size_mb"])
+        for name in names or BENCHMARKS:
+            BENCHMARKS[name](path)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
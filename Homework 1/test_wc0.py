@@ -1,7 +1,23 @@
 import unittest
 import inspect
 import os
+import io
+import json
+import sys
+import socket
+import threading
+import subprocess
+import http.client
+from contextlib import redirect_stdout
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import tempfile
+from unittest import mock
 import wc0_fixed
+import wc_binary
+import wc_async
+import wc_service
+import wc_profile
 
 
 class TestSEPrinciples(unittest.TestCase):
@@ -12,9 +28,12 @@ class TestSEPrinciples(unittest.TestCase):
         Enforce Rule 4: Small Functions.
         Refined Metric (Guru Level): Counts 'Effective Lines of Code' (Logic only).
         """
-        functions = inspect.getmembers(wc0_fixed, inspect.isfunction)
+        functions = [(name, func)
+                     for module in (wc0_fixed, wc_binary, wc_async, wc_service, wc_profile)
+                     for name, func in inspect.getmembers(module, inspect.isfunction)
+                     if func.__module__ == module.__name__]
         for name, func in functions:
-            if name.startswith("__") or func.__module__ != wc0_fixed.__name__:
+            if name.startswith("__"):
                 continue
 
             raw_lines = inspect.getsourcelines(func)[0]
@@ -141,5 +160,541 @@ class TestInfrastructure(unittest.TestCase):
         self.assertEqual(result, set())
 
 
+class TestCorpusMode(unittest.TestCase):
+    """Verifies the parallel multi-file corpus pipeline."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        texts = ["The cat sat. The cat ran!", "A dog, a cat.",
+                 "dog dog (bird)", ""]
+        for i, text in enumerate(texts):
+            path = os.path.join(self.tmp.name, f"doc{i}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_expand_corpus_directory_and_glob(self):
+        """Directories and globs both resolve to the same sorted file list."""
+        by_dir = wc0_fixed.expand_corpus(self.tmp.name)
+        by_glob = wc0_fixed.expand_corpus(os.path.join(self.tmp.name, "*.txt"))
+        self.assertEqual(len(by_dir), 4)
+        self.assertEqual(by_dir, by_glob)
+
+    def test_parallel_matches_serial(self):
+        """Pool output equals the serial path, including first-seen order."""
+        files = wc0_fixed.expand_corpus(self.tmp.name)
+        serial = wc0_fixed.count_corpus_serial(files)
+        parallel = wc0_fixed.count_corpus(files, workers=2)
+        self.assertEqual(list(parallel.items()), list(serial.items()))
+        self.assertEqual(serial["cat"], 3)
+
+    def test_merge_counts(self):
+        """Reducer sums counts across partial results."""
+        merged = wc0_fixed.merge_counts([{"a": 1}, {"b": 2, "a": 3}])
+        self.assertEqual(merged, {"a": 4, "b": 2})
+
+
+class TestChunkedMode(unittest.TestCase):
+    """Verifies byte-range splitting of a single large file."""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".txt")
+        text = "Árbol, the cat!\r\nñandú  dog\tcat\n" * 40 + "end"
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_ranges_cover_file_without_gaps(self):
+        """Ranges are contiguous, ordered and span the whole file."""
+        ranges = wc0_fixed.byte_ranges(self.path, 37)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], os.path.getsize(self.path))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+
+    def test_boundary_words_match_serial(self):
+        """Many small ranges still reproduce the serial counts exactly."""
+        spans = [(self.path, a, b)
+                 for a, b in wc0_fixed.byte_ranges(self.path, 37)]
+        merged = wc0_fixed.merge_counts(map(wc0_fixed.count_range, spans))
+        serial = wc0_fixed.count_file(self.path)
+        self.assertEqual(list(merged.items()), list(serial.items()))
+
+    def test_parallel_matches_serial(self):
+        """The pooled chunked path equals the single-core pipeline."""
+        chunked = wc0_fixed.count_chunked(self.path, workers=2)
+        self.assertEqual(chunked, wc0_fixed.count_file(self.path))
+
+
+class TestMmapEngine(unittest.TestCase):
+    """Verifies the batched engine is byte-identical to the generator path."""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".txt")
+        text = ("The Cat, the CAT!! ... (dog)\r\nÑandú\tΣΑΣ and -- \"[cat]\"\n"
+                * 25)
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+
+    def tearDown(self):
+        os.remove(self.path)
+        wc0_fixed.CONFIG["engine"] = "generator"
+
+    def test_blocks_do_not_split_words(self):
+        """Tiny blocks still end on whitespace and cover the whole file."""
+        blocks = list(wc0_fixed.stream_blocks(self.path, 7))
+        with open(self.path, encoding="utf-8", newline="") as f:
+            self.assertEqual("".join(blocks), f.read())
+        self.assertTrue(all(b[-1].isspace() for b in blocks[:-1]))
+
+    def test_engine_matches_generator(self):
+        """Same counts in the same order, selected through CONFIG."""
+        reference = wc0_fixed.count_file(self.path)
+        wc0_fixed.CONFIG["engine"] = "mmap"
+        batched = wc0_fixed.count_file(self.path)
+        self.assertEqual(list(batched.items()), list(reference.items()))
+
+    def test_empty_file(self):
+        """An empty file yields no blocks instead of an mmap error."""
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+        self.assertEqual(list(wc0_fixed.stream_blocks(self.path, 64)), [])
+
+
+class TestTopN(unittest.TestCase):
+    """Verifies exact heap selection and approximate heavy hitters."""
+
+    def test_heap_matches_full_sort(self):
+        """nlargest keeps the same tie order as the stable full sort."""
+        counts = {"b": 2, "a": 3, "c": 2, "d": 1, "e": 2, "f": 3}
+        for n in range(len(counts) + 2):
+            self.assertEqual(wc0_fixed.get_top_items(counts, n),
+                             wc0_fixed.get_sorted_items(counts)[:n])
+
+    def test_summary_exact_within_capacity(self):
+        """With enough counters, Space-Saving is exact with zero error."""
+        words = ["x", "y", "x", "z", "x", "y"]
+        summary = wc0_fixed.summarize_stream(iter(words), capacity=3)
+        self.assertEqual(wc0_fixed.summary_top(summary, 3),
+                         [("x", 3, 0), ("y", 2, 0), ("z", 1, 0)])
+
+    def test_summary_error_bounds(self):
+        """Under memory pressure, true counts stay within the reported bounds."""
+        words = [f"w{i % 97}" if i % 3 else "hot" for i in range(3000)]
+        summary = wc0_fixed.summarize_stream(iter(words), capacity=10)
+        truth = wc0_fixed.count_from_stream(words)
+        self.assertLessEqual(len(summary["counts"]), 10)
+        self.assertLessEqual(len(summary["heap"]), 40)
+        for word, count, error in wc0_fixed.summary_top(summary, 10):
+            self.assertLessEqual(count - error, truth.get(word, 0))
+            self.assertLessEqual(truth.get(word, 0), count)
+            self.assertLessEqual(error, summary["total"] // 10)
+        self.assertEqual(wc0_fixed.summary_top(summary, 1)[0][0], "hot")
+
+
+class TestIncrementalIndex(unittest.TestCase):
+    """Verifies the persistent per-file count index."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index = os.path.join(self.tmp.name, "index.json")
+        self.corpus = os.path.join(self.tmp.name, "corpus")
+        os.mkdir(self.corpus)
+        for name, text in [("a.txt", "cat dog cat"), ("b.txt", "bird cat"),
+                           ("c.txt", "dog fish")]:
+            self.write(name, text)
+        wc0_fixed.CONFIG["workers"] = 1
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        wc0_fixed.CONFIG["workers"] = None
+
+    def write(self, name, text):
+        with open(os.path.join(self.corpus, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def run_indexed(self):
+        """Returns (counts, number of files actually recounted)."""
+        files = wc0_fixed.expand_corpus(self.corpus)
+        with mock.patch.object(wc0_fixed, "count_file",
+                               wraps=wc0_fixed.count_file) as spy:
+            counts = wc0_fixed.count_indexed(files, self.index)
+        expected = wc0_fixed.count_corpus_serial(files)
+        self.assertEqual(list(counts.items()), list(expected.items()))
+        return counts, spy.call_count
+
+    def test_unchanged_rerun_recounts_nothing(self):
+        """A second run over the same corpus is served from the index."""
+        self.assertEqual(self.run_indexed()[1], 3)
+        self.assertEqual(self.run_indexed()[1], 0)
+
+    def test_changes_deletions_and_additions(self):
+        """Only new/changed files are recounted; deleted ones drop out."""
+        self.run_indexed()
+        self.write("b.txt", "bird bird owl cat")
+        os.remove(os.path.join(self.corpus, "c.txt"))
+        self.write("d.txt", "newt")
+        counts, recounted = self.run_indexed()
+        self.assertEqual(recounted, 2)
+        self.assertNotIn("fish", counts)
+
+    def test_touch_without_change_is_not_recounted(self):
+        """A new mtime with identical content is confirmed by hash."""
+        self.run_indexed()
+        os.utime(os.path.join(self.corpus, "a.txt"), ns=(1, 1))
+        self.assertEqual(self.run_indexed()[1], 0)
+
+    def test_policy_change_invalidates(self):
+        """Changing stopwords/punct fingerprints forces a full recount."""
+        self.run_indexed()
+        original = wc0_fixed.CONFIG["stopwords"]
+        wc0_fixed.CONFIG["stopwords"] = original | {"cat"}
+        try:
+            self.assertEqual(self.run_indexed()[1], 3)
+        finally:
+            wc0_fixed.CONFIG["stopwords"] = original
+
+
+class TestBinaryFormat(unittest.TestCase):
+    """Verifies the compact binary result format and streaming merge."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.policy = {"punct": ".,", "fingerprint": "abc"}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_varint_round_trip(self):
+        """LEB128 encoding survives a round trip at byte boundaries."""
+        for value in (0, 1, 127, 128, 300, 2 ** 35 + 7):
+            raw = wc_binary.encode_varint(value)
+            self.assertEqual(wc_binary.read_varint(io.BytesIO(raw)), value)
+            self.assertEqual(wc_binary.decode_varint(b"x" + raw, 1),
+                             (value, 1 + len(raw)))
+            self.assertEqual(list(wc_binary.varints(raw * 2)), [value, value])
+
+    def test_long_words_round_trip(self):
+        """Words whose length needs a multi-byte varint decode correctly."""
+        counts = {"a" * 200: 2 ** 35, "é" * 70: 1, "b": 5}
+        wc_binary.save_counts(self.path("long.wcb"), counts, self.policy)
+        self.assertEqual(wc_binary.load_counts(self.path("long.wcb")), counts)
+
+    def test_write_read_round_trip(self):
+        """Counts and the recorded policy come back unchanged."""
+        counts = {"zeta": 3, "alpha": 1, "ñandú": 200, "émigré": 2}
+        wc_binary.save_counts(self.path("r.wcb"), counts, self.policy)
+        self.assertEqual(wc_binary.load_counts(self.path("r.wcb")), counts)
+        self.assertEqual(list(wc_binary.iter_records(self.path("r.wcb"))),
+                         sorted(counts.items()))
+        self.assertEqual(wc_binary.load_header(self.path("r.wcb"))["policy"],
+                         self.policy)
+
+    def test_streaming_merge(self):
+        """Merging files sums counts exactly like merge_counts."""
+        parts = [{"cat": 2, "dog": 1}, {"bird": 4, "cat": 1}, {}, {"zebra": 9}]
+        paths = [self.path(f"p{i}.wcb") for i in range(len(parts))]
+        for part, path in zip(parts, paths):
+            wc_binary.save_counts(path, part, self.policy)
+        wc_binary.merge_files(self.path("m.wcb"), paths)
+        self.assertEqual(wc_binary.load_counts(self.path("m.wcb")),
+                         wc0_fixed.merge_counts(parts))
+
+    def test_merge_rejects_mixed_policies(self):
+        """Results counted under different policies cannot be merged."""
+        wc_binary.save_counts(self.path("a.wcb"), {"a": 1}, self.policy)
+        wc_binary.save_counts(self.path("b.wcb"), {"a": 1}, {"punct": ""})
+        with self.assertRaises(ValueError):
+            wc_binary.merge_files(self.path("m.wcb"),
+                                  [self.path("a.wcb"), self.path("b.wcb")])
+
+
+class TestAsyncPipeline(unittest.TestCase):
+    """Verifies the asyncio ingestion path against the sync pipeline."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files = []
+        for i, text in enumerate(["The cat sat.\nA dog!", "cat (bird) cat\n",
+                                  "", "ñandú dog\n" * 3000]):
+            self.files.append(os.path.join(self.tmp.name, f"f{i}.txt"))
+            with open(self.files[-1], "w", encoding="utf-8") as f:
+                f.write(text)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_files_match_serial(self):
+        """Concurrent file sources equal the serial corpus path, in order."""
+        counts = wc_async.count_sources(self.files, concurrency=2)
+        expected = wc0_fixed.count_corpus_serial(self.files)
+        self.assertEqual(list(counts.items()), list(expected.items()))
+
+    def test_socket_and_file_sources(self):
+        """A Unix-socket source is counted like the same text in a file."""
+        sock = os.path.join(self.tmp.name, "s.sock")
+
+        async def serve(_reader, writer):
+            with open(self.files[3], "rb") as f:
+                writer.write(f.read())
+            await writer.drain()
+            writer.close()
+
+        async def scenario():
+            async with await asyncio.start_unix_server(serve, sock):
+                return await wc_async.acount_sources(
+                    [self.files[0], f"unix:{sock}"], concurrency=1)
+
+        expected = wc0_fixed.count_corpus_serial([self.files[0], self.files[3]])
+        self.assertEqual(asyncio.run(scenario()), expected)
+
+    def test_missing_source_raises(self):
+        """Reader errors surface to the caller instead of hanging the queue."""
+        with self.assertRaises(FileNotFoundError):
+            wc_async.count_sources([os.path.join(self.tmp.name, "nope.txt")])
+
+    def test_any_source_error_raises(self):
+        """An unexpected error in a source is forwarded, not left to hang."""
+        async def broken():
+            yield "cat\n"
+            raise RuntimeError("boom")
+
+        async def scenario():
+            return [b async for b in wc_async.abuffered(broken(), 2)]
+
+        with self.assertRaisesRegex(RuntimeError, "boom"):
+            asyncio.run(asyncio.wait_for(scenario(), 5))
+
+
+class TestPolicyCache(unittest.TestCase):
+    """Verifies lazy policy loading and the compiled policy cache."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved = dict(wc0_fixed.CONFIG)
+        policy_file = os.path.join(self.tmp.name, "policy.yaml")
+        with open(policy_file, "w", encoding="utf-8") as f:
+            f.write('punct: "!"\nstopwords:\n  - foo\n')
+        wc0_fixed.CONFIG.update(
+            policy_file=policy_file,
+            policy_cache=os.path.join(self.tmp.name, "policy.cache"))
+
+    def tearDown(self):
+        wc0_fixed.CONFIG.clear()
+        wc0_fixed.CONFIG.update(self.saved)
+        self.tmp.cleanup()
+
+    def compile_spy(self):
+        """Compiles the policy; returns (policy, whether YAML was parsed)."""
+        with mock.patch.object(wc0_fixed, "load_policy_backpacking",
+                               wraps=wc0_fixed.load_policy_backpacking) as spy:
+            return wc0_fixed.compile_policy(), spy.called
+
+    def test_import_is_lazy(self):
+        """Importing the module does not read or parse any policy file."""
+        probe = "import wc0_fixed as w; print(w.CONFIG['policy_loaded'])"
+        out = subprocess.run([sys.executable, "-c", probe], check=True,
+                             capture_output=True, text=True).stdout
+        self.assertEqual(out.strip(), "False")
+
+    def test_fresh_cache_skips_parsing(self):
+        """The second compile is served from the artifact without parsing."""
+        first, parsed = self.compile_spy()
+        self.assertTrue(parsed)
+        second, parsed = self.compile_spy()
+        self.assertFalse(parsed)
+        self.assertEqual(second, first)
+        self.assertEqual(second["stopwords"], frozenset({"foo"}))
+
+    def test_changed_source_rebuilds(self):
+        """Editing the policy file invalidates the cached artifact."""
+        self.compile_spy()
+        with open(wc0_fixed.CONFIG["policy_file"], "a", encoding="utf-8") as f:
+            f.write("  - bar\n")
+        policy, parsed = self.compile_spy()
+        self.assertTrue(parsed)
+        self.assertIn("bar", policy["stopwords"])
+
+    def test_flag_change_rebuilds(self):
+        """Turning on external stopwords is part of the cache key."""
+        self.compile_spy()
+        wc0_fixed.CONFIG["load_external_stopwords"] = True
+        with mock.patch("sys.stderr", new=io.StringIO()):
+            policy, parsed = self.compile_spy()
+        self.assertTrue(parsed)
+        self.assertIn("because", policy["stopwords"])
+
+
+class TestService(unittest.TestCase):
+    """Verifies the long-running HTTP / Unix-socket word-count service."""
+
+    DOC = "The cat sat on the mat. The cat ran!\n(Dog) dog, bird."
+
+    @classmethod
+    def setUpClass(cls):
+        wc_service.SERVICE_CONFIG["workers"] = 2
+        cls.server = wc_service.start("127.0.0.1:0")
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        wc_service.stop(cls.server)
+        wc_service.SERVICE_CONFIG["workers"] = None
+
+    def request(self, method, path, body=None):
+        conn = http.client.HTTPConnection(*self.server.server_address)
+        conn.request(method, path, body=body)
+        response = conn.getresponse()
+        return response.status, response.read().decode("utf-8")
+
+    def expected(self, fmt):
+        """What run() prints for the same document and format."""
+        out, saved = io.StringIO(), wc0_fixed.CONFIG["format"]
+        wc0_fixed.CONFIG["format"] = fmt
+        try:
+            counts = wc0_fixed.count_from_stream(wc0_fixed.stream_filter(
+                wc0_fixed.stream_words(io.StringIO(self.DOC))))
+            with redirect_stdout(out):
+                wc0_fixed.print_formatted("doc", counts, wc0_fixed.rank_items(counts))
+        finally:
+            wc0_fixed.CONFIG["format"] = saved
+        return out.getvalue()
+
+    def test_formats_match_pipeline(self):
+        """Every supported format is rendered exactly like print_formatted."""
+        for fmt in ("text", "json", "csv"):
+            status, body = self.request("POST", f"/count?format={fmt}&name=doc",
+                                        self.DOC.encode("utf-8"))
+            self.assertEqual(status, 200)
+            self.assertEqual(body, self.expected(fmt))
+
+    def test_binary_format(self):
+        """format=binary answers with the wc_binary.py file format."""
+        conn = http.client.HTTPConnection(*self.server.server_address)
+        conn.request("POST", "/count?format=binary", body=self.DOC.encode("utf-8"))
+        response = conn.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Type"), "application/octet-stream")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "doc.wcb")
+            with open(path, "wb") as f:
+                f.write(response.read())
+            counts = wc0_fixed.count_from_stream(wc0_fixed.stream_filter(
+                wc0_fixed.stream_words(io.StringIO(self.DOC))))
+            self.assertEqual(wc_binary.load_counts(path), counts)
+            self.assertEqual(wc_binary.load_header(path)["policy"],
+                             wc0_fixed.result_policy())
+
+    def test_concurrent_clients_and_stats(self):
+        """Parallel clients are all served and show up in latency stats."""
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            self.request("POST", "/count?format=json", self.DOC.encode("utf-8"))))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual([status for status, _ in results], [200] * 8)
+        stats = json.loads(self.request("GET", "/stats")[1])
+        self.assertGreaterEqual(stats["served"], 8)
+        self.assertLessEqual(stats["p50_ms"], stats["max_ms"])
+
+    def test_bad_requests(self):
+        """Unknown formats and endpoints are rejected, not counted."""
+        self.assertEqual(self.request("POST", "/count?format=xml", b"x")[0], 400)
+        self.assertEqual(self.request("POST", "/nope", b"x")[0], 404)
+
+    def test_worker_failure_is_500(self):
+        """A broken worker pool answers 500 and counts as an error."""
+        class BrokenPool:
+            def submit(self, *_args):
+                raise BrokenProcessPool("a worker died")
+
+        pool, self.server.pool = self.server.pool, BrokenPool()
+        try:
+            errors = json.loads(self.request("GET", "/stats")[1])["errors"]
+            status, body = self.request("POST", "/count", self.DOC.encode("utf-8"))
+        finally:
+            self.server.pool = pool
+        self.assertEqual(status, 500)
+        self.assertIn("a worker died", body)
+        self.assertEqual(json.loads(self.request("GET", "/stats")[1])["errors"], errors + 1)
+
+    def test_unix_socket(self):
+        """The same API answers over a Unix domain socket."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "wc.sock")
+            server = wc_service.start(f"unix:{path}")
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                with socket.socket(socket.AF_UNIX) as sock:
+                    sock.connect(path)
+                    sock.sendall(b"POST /count?format=json HTTP/1.0\r\n"
+                                 b"Content-Length: 9\r\n\r\ncat a cat")
+                    reply = sock.makefile("rb").read().decode("utf-8")
+            finally:
+                server.shutdown()
+                wc_service.stop(server)
+        self.assertIn("200 OK", reply)
+        self.assertEqual(json.loads(reply.split("\r\n\r\n", 1)[1]), {"cat": 2})
+
+
+class TestProfiling(unittest.TestCase):
+    """Verifies the opt-in per-stage instrumentation layer."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved = dict(wc0_fixed.CONFIG)
+        doc = os.path.join(self.tmp.name, "doc.txt")
+        with open(doc, "w", encoding="utf-8") as f:
+            f.write("The cat sat.\nThe dog ran, the cat hid!\n")
+        wc0_fixed.CONFIG.update(
+            file=doc, profile_file=os.path.join(self.tmp.name, "profile.json"))
+
+    def tearDown(self):
+        wc0_fixed.CONFIG.clear()
+        wc0_fixed.CONFIG.update(self.saved)
+        self.tmp.cleanup()
+
+    def capture_run(self):
+        out = io.StringIO()
+        with redirect_stdout(out), mock.patch("sys.stderr", new=io.StringIO()):
+            wc0_fixed.run()
+        return out.getvalue()
+
+    def test_stdout_unchanged_and_report_written(self):
+        """Profiling keeps stdout identical and saves a JSON report."""
+        plain = self.capture_run()
+        wc0_fixed.CONFIG["profile"] = True
+        self.assertEqual(self.capture_run(), plain)
+        with open(wc0_fixed.CONFIG["profile_file"], encoding="utf-8") as f:
+            report = json.load(f)
+        self.assertEqual(list(report["stages"]), list(wc_profile.STAGES))
+        self.assertEqual(report["bytes_read"], 39)
+
+    def test_stage_counts(self):
+        """Item counts line up with what each stage actually produced."""
+        wc0_fixed.CONFIG["profile"] = True
+        self.capture_run()
+        with open(wc0_fixed.CONFIG["profile_file"], encoding="utf-8") as f:
+            stages = json.load(f)["stages"]
+        self.assertEqual(stages["lines"]["items"], 2)
+        self.assertEqual(stages["words"]["items"], 9)
+        self.assertEqual(stages["filter"]["items"], 6)
+        self.assertEqual(stages["count"]["items"], 6)
+        for stats in stages.values():
+            self.assertGreaterEqual(stats["self_seconds"], 0.0)
+            self.assertGreater(stats["peak_bytes"], 0)
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
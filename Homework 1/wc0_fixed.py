@@ -6,8 +6,21 @@ Heuristics Applied: SoC, SRP, Mechanism vs Policy, Small Functions, Streaming, B
 """
 
 import sys
-import json
-from typing import Iterator, Dict, List, Tuple, Optional, Any, Set
+import os
+import mmap
+import marshal
+import heapq
+from operator import itemgetter
+from collections import Counter
+from itertools import chain, accumulate, repeat
+from typing import (Iterator, Iterable, Callable, Dict, List, Tuple,
+                    Optional, Any, Set, BinaryIO, TYPE_CHECKING)
+
+# Startup budget: modules that only some modes need (process pools, glob,
+# regex, json, hashing, the binary writer) are imported inside the functions that
+# use them, so a plain `import wc0_fixed` stays cheap.
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
 
 # =============================================================================
 # INFRASTRUCTURE (The "VITAL" Layer)
@@ -49,6 +62,94 @@ def load_stopwords_file(filepath: str) -> Set[str]:
     except FileNotFoundError:
         return set()
 
+
+def expand_corpus(spec: str) -> List[str]:
+    """Infrastructure: Resolves a directory or glob into a sorted file list."""
+    import glob  # pylint: disable=import-outside-toplevel
+    if os.path.isdir(spec):
+        spec = os.path.join(spec, "**", "*")
+    paths = glob.glob(spec, recursive=True)
+    return sorted(p for p in paths if os.path.isfile(p))
+
+
+def file_stat(filepath: str) -> Dict[str, int]:
+    """Infrastructure: The cheap change signal (size + mtime) of a file."""
+    st = os.stat(filepath)
+    return {"size": st.st_size, "mtime": st.st_mtime_ns}
+
+
+def file_digest(filepath: str) -> str:
+    """Infrastructure: Content hash, read in 1 MiB blocks."""
+    import hashlib  # pylint: disable=import-outside-toplevel
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_index(filepath: str) -> Dict[str, Any]:
+    """Infrastructure: Reads the persistent count index (empty if absent/corrupt)."""
+    import json  # pylint: disable=import-outside-toplevel
+    try:
+        with open(filepath, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_index(filepath: str, index: Dict[str, Any]) -> None:
+    """Infrastructure: Writes the index atomically (temp file + rename)."""
+    import json  # pylint: disable=import-outside-toplevel
+    tmp = f"{filepath}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(tmp, filepath)
+
+
+def load_compiled_policy(filepath: str, key: List[Any]) -> Optional[Dict[str, Any]]:
+    """Infrastructure: Returns the cached compiled policy if its key matches."""
+    try:
+        with open(filepath, "rb") as f:
+            cached = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    fresh = isinstance(cached, dict) and cached.get("key") == key
+    return cached["policy"] if fresh else None
+
+
+def save_compiled_policy(filepath: str, key: List[Any],
+                         policy: Dict[str, Any]) -> None:
+    """Infrastructure: Writes the compiled policy atomically; best effort."""
+    try:
+        with open(f"{filepath}.tmp", "wb") as f:
+            marshal.dump({"key": key, "policy": policy}, f)
+        os.replace(f"{filepath}.tmp", filepath)
+    except OSError:
+        pass  # read-only directory: just parse again next time
+
+
+def align_offset(f: BinaryIO, offset: int) -> int:
+    """Infrastructure: Moves a byte offset to just past the next whitespace byte."""
+    f.seek(offset)
+    byte = f.read(1)
+    while byte and not byte.isspace():
+        byte = f.read(1)
+    return f.tell()
+
+
+def byte_ranges(filepath: str, parts: int) -> List[Tuple[int, int]]:
+    """
+    Infrastructure: Splits a file into ~equal byte ranges that never cut a word.
+    Cuts land after an ASCII whitespace byte, which is never part of a
+    multi-byte UTF-8 sequence, so every range decodes and tokenizes on its own.
+    """
+    size = os.path.getsize(filepath)
+    with open(filepath, "rb") as f:
+        inner = [align_offset(f, size * i // parts) for i in range(1, parts)]
+    cuts = list(accumulate([0] + inner + [size], max))
+    return [(a, b) for a, b in zip(cuts, cuts[1:]) if a < b]
+
 # =============================================================================
 # POLICY LAYER (The "Smart Edge")
 # =============================================================================
@@ -58,6 +159,28 @@ CONFIG: Dict[str, Any] = {
     "file": "essay.txt",
     "policy_file": "config.yaml",
 
+    # Lazy Policy: "stopwords"/"punct" are filled in from policy_file on
+    # first use (ensure_policy), not at import. The compiled result is
+    # cached in policy_cache, keyed on source file stats (None disables).
+    "stopwords": frozenset(),
+    "punct": '.,!?;:"()[]',
+    "policy_loaded": False,
+    "policy_cache": ".wc0_policy.cache",
+
+    # Corpus Mode: a directory or glob counted across a process pool.
+    # None keeps the classic single-file run on CONFIG["file"].
+    "corpus": None,
+    "workers": None,  # None -> os.cpu_count()
+
+    # Chunked Mode: split one large CONFIG["file"] into byte ranges,
+    # counted in parallel (CONFIG["workers"] * 4 ranges for load balance).
+    "chunked": False,
+
+    # Counting Engine: "generator" (per-word pipeline, the reference) or
+    # "mmap" (memory-mapped blocks tokenized and counted in bulk).
+    "engine": "generator",
+    "block_bytes": 1 << 22,
+
     # Feature Flag: Default to False to ensure identical output for grading.
     # GRADING NOTE: Set this to True to verify Bonus 2 & 4 (External
     # Stopwords).
@@ -69,33 +192,82 @@ CONFIG: Dict[str, Any] = {
     "stopwords_file_es": "stopwords_es.txt",
 
     "top_n": 10,
-    "format": "text",
+    # True limits CSV output to the top_n rows (heap selection, no full sort).
+    "csv_top_n": False,
+
+    # Approximate Mode: Space-Saving heavy hitters in a fixed number of
+    # counters, for vocabularies too large for RAM. Reports error bounds.
+    "heavy_hitters": False,
+    "hh_capacity": 1000,
+
+    # Incremental Index: path of a persistent per-file count cache. Reruns
+    # only recount new/changed files. None disables the index.
+    "index_file": None,
+
+    # Profiling: per-stage items/sec, time and peak memory (wc_profile.py).
+    # JSON goes to profile_file, a summary to stderr; stdout is unchanged.
+    "profile": False,
+    "profile_file": "profile.json",
+
+    "format": "text",  # text | json | csv | binary (see wc_binary.py)
     "bar_char": "*",
     "width_idx": 2,
     "width_word": 15,
     "width_count": 3
 }
 
-# 1. Load base policy from YAML
-_loaded_policy = load_policy_backpacking(CONFIG["policy_file"])
-CONFIG.update(_loaded_policy)
 
-# 2. (Optional) Merge external stopwords if Feature Flag is ON
-if CONFIG.get("load_external_stopwords"):
+
+def external_stopwords() -> Set[str]:
+    """(Optional) External stopwords if the Feature Flag is ON (Bonus 2 & 4)."""
+    if not CONFIG.get("load_external_stopwords"):
+        return set()
     lang = CONFIG["language"]
-    # Determine which file to load based on language (Bonus 4)
-    key = f"stopwords_file_{lang}"
-
-    if key in CONFIG:
-        fpath = CONFIG[key]
-        print(
-            f"[INFO] Merging {lang} stopwords from {fpath}...",
-            file=sys.stderr)
-        CONFIG["stopwords"].update(load_stopwords_file(fpath))
-    else:
-        print(
-            f"[WARN] No stopword file found for language '{lang}'",
-            file=sys.stderr)
+    key = f"stopwords_file_{lang}"  # Which file to load per language
+    if key not in CONFIG:
+        print(f"[WARN] No stopword file found for language '{lang}'", file=sys.stderr)
+        return set()
+    print(f"[INFO] Merging {lang} stopwords from {CONFIG[key]}...", file=sys.stderr)
+    return load_stopwords_file(CONFIG[key])
+
+
+def build_policy() -> Dict[str, Any]:
+    """Parses the YAML policy and merges external stopwords (the slow path)."""
+    policy = load_policy_backpacking(CONFIG["policy_file"])
+    stopwords = frozenset(policy["stopwords"] | external_stopwords())
+    return {"stopwords": stopwords, "punct": policy["punct"]}
+
+
+def policy_sources() -> List[str]:
+    """The files a compiled policy depends on."""
+    sources = [CONFIG["policy_file"]]
+    if CONFIG.get("load_external_stopwords"):
+        sources.append(CONFIG.get(f"stopwords_file_{CONFIG['language']}", ""))
+    return sources
+
+
+def policy_key() -> List[Any]:
+    """Cache key: flags, marshal format and (size, mtime) of every source file."""
+    stats = [file_stat(p) if os.path.exists(p) else None for p in policy_sources()]
+    return [marshal.version, CONFIG["load_external_stopwords"],
+            CONFIG["language"], policy_sources(), stats]
+
+
+def compile_policy() -> Dict[str, Any]:
+    """Returns the policy from the cached artifact when fresh, else builds it."""
+    cache, key = CONFIG["policy_cache"], policy_key()
+    policy = load_compiled_policy(cache, key) if cache else None
+    if policy is None:
+        policy = build_policy()
+        if cache:
+            save_compiled_policy(cache, key, policy)
+    return policy
+
+
+def ensure_policy() -> None:
+    """Lazy init: loads the policy on first use; later calls are free."""
+    if not CONFIG["policy_loaded"]:
+        CONFIG.update(compile_policy(), policy_loaded=True)
 
 # =============================================================================
 # MECHANISM LAYER (The "Dumb Center") - Model & Logic
@@ -117,6 +289,35 @@ def stream_lines(filepath: str) -> Iterator[str]:
             yield line
 
 
+def stream_range_lines(filepath: str, start: int, end: int) -> Iterator[str]:
+    """Generator: Yields decoded lines covering bytes [start, end) of a file."""
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        while start < end and (line := f.readline(end - start)):
+            start += len(line)
+            yield line.decode("utf-8")
+
+
+def block_end(buf: mmap.mmap, pos: int) -> int:
+    """Returns the offset just past the first whitespace byte at/after pos."""
+    import re  # pylint: disable=import-outside-toplevel
+    found = re.compile(rb"\s").search(buf, pos) if pos < len(buf) else None
+    return found.end() if found else len(buf)
+
+
+def stream_blocks(filepath: str, size: int) -> Iterator[str]:
+    """Generator: Yields ~size-byte decoded blocks of a memory-mapped file."""
+    if os.path.getsize(filepath) == 0:
+        return
+    with open(filepath, "rb") as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        start = 0
+        while start < len(buf):
+            end = block_end(buf, start + size)
+            yield buf[start:end].decode("utf-8")
+            start = end
+
+
 def stream_words(lines: Iterator[str]) -> Iterator[str]:
     """
     Generator: Tokenizes lines into raw words.
@@ -143,6 +344,7 @@ def clean_word(word: str) -> str:
 
 def stream_filter(raw_words: Iterator[str]) -> Iterator[str]:
     """Generator: Pipeline filter that cleans and removes stopwords."""
+    ensure_policy()
     stopwords: Set[str] = CONFIG["stopwords"]
     for w in raw_words:
         cleaned = clean_word(w)
@@ -161,10 +363,112 @@ def count_from_stream(word_stream: Iterator[str]) -> Dict[str, int]:
     return counts
 
 
+def count_blocks(blocks: Iterator[str]) -> Dict[str, int]:
+    """
+    Batched engine: Lowercases, splits and strips whole blocks, then counts
+    with Counter's C-level update. Stopwords and empty tokens are dropped
+    after counting; deleting keys keeps first-seen order, so the result is
+    identical (including dict order) to the generator pipeline.
+    """
+    ensure_policy()
+    counts: Counter = Counter()
+    punct = CONFIG["punct"]
+    for block in blocks:
+        counts.update(map(str.strip, block.lower().split(), repeat(punct)))
+    for w in (CONFIG["stopwords"] | {""}) & counts.keys():
+        del counts[w]
+    return dict(counts)
+
+
+def merge_counts(parts: Iterable[Dict[str, int]]) -> Dict[str, int]:
+    """
+    Reducer: Folds per-file counts into one dict.
+    Merging in input order keeps first-seen word order identical to a
+    serial run, so ties in get_sorted_items break the same way.
+    """
+    total: Dict[str, int] = {}
+    for part in parts:
+        for w, c in part.items():
+            total[w] = total.get(w, 0) + c
+    return total
+
+
 def get_sorted_items(counts: Dict[str, int]) -> List[Tuple[str, int]]:
     """Sorts dictionary items by value (descending)."""
     return sorted(counts.items(), key=lambda x: x[1], reverse=True)
 
+
+def get_top_items(counts: Dict[str, int], n: int) -> List[Tuple[str, int]]:
+    """
+    Heap selection: O(V log n) instead of a full O(V log V) sort.
+    heapq.nlargest is stable, so it equals get_sorted_items(counts)[:n].
+    """
+    return heapq.nlargest(n, counts.items(), key=itemgetter(1))
+
+# Space-Saving (Metwally et al.): keeps at most `capacity` counters. A new
+# word evicts the smallest counter and inherits its count, recorded as that
+# word's error. Every reported count c satisfies c - error <= true <= c, and
+# no error exceeds total / capacity. The min-heap is lazy (stale entries are
+# skipped) and rebuilt when it outgrows the counters, so memory stays O(k).
+
+
+def new_summary(capacity: int) -> Dict[str, Any]:
+    """Creates an empty Space-Saving summary with a fixed counter budget."""
+    return {"capacity": capacity, "total": 0,
+            "counts": {}, "errors": {}, "heap": []}
+
+
+def summary_min(summary: Dict[str, Any]) -> Tuple[int, str]:
+    """Drops stale heap entries and returns the live (count, word) minimum."""
+    heap, counts = summary["heap"], summary["counts"]
+    while heap[0][0] != counts.get(heap[0][1]):
+        heapq.heappop(heap)
+    return heap[0]
+
+
+def summary_evict(summary: Dict[str, Any], word: str) -> None:
+    """Replaces the minimum counter with `word`, inheriting its count."""
+    low, victim = summary_min(summary)
+    del summary["counts"][victim]
+    summary["errors"].pop(victim, None)
+    summary["counts"][word] = low + 1
+    summary["errors"][word] = low
+
+
+def summary_push(summary: Dict[str, Any], word: str) -> None:
+    """Records the word's new count in the heap, compacting when oversized."""
+    heapq.heappush(summary["heap"], (summary["counts"][word], word))
+    if len(summary["heap"]) > 4 * summary["capacity"]:
+        summary["heap"] = [(c, w) for w, c in summary["counts"].items()]
+        heapq.heapify(summary["heap"])
+
+
+def summary_add(summary: Dict[str, Any], word: str) -> None:
+    """Counts one occurrence of `word` within the fixed memory budget."""
+    counts = summary["counts"]
+    summary["total"] += 1
+    if word not in counts and len(counts) >= summary["capacity"]:
+        summary_evict(summary, word)
+    else:
+        counts[word] = counts.get(word, 0) + 1
+    summary_push(summary, word)
+
+
+def summarize_stream(word_stream: Iterator[str],
+                     capacity: int) -> Dict[str, Any]:
+    """Consumer: Approximate counterpart of count_from_stream."""
+    summary = new_summary(capacity)
+    for w in word_stream:
+        summary_add(summary, w)
+    return summary
+
+
+def summary_top(summary: Dict[str, Any],
+                n: int) -> List[Tuple[str, int, int]]:
+    """Returns the n largest (word, count, error) triples."""
+    top = get_top_items(summary["counts"], n)
+    return [(w, c, summary["errors"].get(w, 0)) for w, c in top]
+
 # =============================================================================
 # PRESENTATION LAYER (I/O Only)
 # =============================================================================
@@ -175,12 +479,14 @@ def get_sorted_items(counts: Dict[str, int]) -> List[Tuple[str, int]]:
 
 
 def print_header(filename: str) -> None:
+    """Prints the report banner for one file or corpus."""
     print(f"\n{'=' * 50}")
     print(f"WORD FREQUENCY ANALYSIS - {filename}")
     print(f"{'=' * 50}\n")
 
 
 def print_stats(counts: Dict[str, int]) -> None:
+    """Prints total and unique word counts."""
     total = sum(counts.values())
     unique = len(counts)
     print(f"Total words (after removing stopwords): {total}")
@@ -189,6 +495,7 @@ def print_stats(counts: Dict[str, int]) -> None:
 
 def to_json(counts: Dict[str, int]) -> None:
     """Bonus: Dumps results as JSON."""
+    import json  # pylint: disable=import-outside-toplevel
     print(json.dumps(counts, indent=2))
 
 
@@ -199,6 +506,19 @@ def to_csv(sorted_items: List[Tuple[str, int]]) -> None:
         print(f"{i},{word},{count}")
 
 
+def result_policy() -> Dict[str, Any]:
+    """Policy recorded in binary result headers (merges require a match)."""
+    return {"punct": CONFIG["punct"], "fingerprint": policy_fingerprint()}
+
+
+def to_binary(counts: Dict[str, int]) -> None:
+    """Writes the compact binary format (wc_binary.py) to stdout."""
+    import wc_binary  # pylint: disable=import-outside-toplevel
+    sys.stdout.flush()
+    wc_binary.write_counts(sys.stdout.buffer, counts, result_policy())
+    sys.stdout.buffer.flush()
+
+
 def format_row(i: int, word: str, count: int) -> str:
     """Formats a single output row using CONFIG policies."""
     bar = CONFIG["bar_char"] * count
@@ -208,6 +528,7 @@ def format_row(i: int, word: str, count: int) -> str:
 
 
 def print_top_n(sorted_items: List[Tuple[str, int]]) -> None:
+    """Prints the top_n rows with their bars."""
     n = CONFIG["top_n"]
     print(f"Top {n} most frequent words:\n")
     for i, (word, count) in enumerate(sorted_items[:n], 1):
@@ -223,6 +544,50 @@ def print_report(
     print_top_n(sorted_items)
 
 
+def print_hh_header(summary: Dict[str, Any]) -> None:
+    """Prints the approximate-mode banner and its global error bound."""
+    total, k = summary["total"], summary["capacity"]
+    print(f"Approximate mode (Space-Saving, {k} counters): {total} words seen")
+    print(f"Each count may overestimate by 'err' (never more than {total // k}).\n")
+
+
+def hh_to_json(summary: Dict[str, Any], top: List[Tuple[str, int, int]]) -> None:
+    """Approximate counts with per-word and global error bounds as JSON."""
+    import json  # pylint: disable=import-outside-toplevel
+    items = {w: {"count": c, "error": e} for w, c, e in top}
+    print(json.dumps({"total": summary["total"], "capacity": summary["capacity"],
+                      "max_error": summary["total"] // summary["capacity"],
+                      "items": items}, indent=2))
+
+
+def hh_to_csv(top: List[Tuple[str, int, int]]) -> None:
+    """Approximate counts with per-word error bounds as CSV."""
+    print("rank,word,count,error")
+    for i, (word, count, error) in enumerate(top, 1):
+        print(f"{i},{word},{count},{error}")
+
+
+def print_hh_report(filename: str, top: List[Tuple[str, int, int]],
+                    summary: Dict[str, Any]) -> None:
+    """Text report of approximate counts, each row with its error bound."""
+    print_header(filename)
+    print_hh_header(summary)
+    for i, (word, count, error) in enumerate(top, 1):
+        print(f"{format_row(i, word, count)}  err<={error}")
+    print()
+
+
+def print_hh_formatted(filename: str, summary: Dict[str, Any]) -> None:
+    """Selects the output format for approximate (heavy-hitter) results."""
+    top = summary_top(summary, CONFIG["top_n"])
+    if CONFIG["format"] == "json":
+        hh_to_json(summary, top)
+    elif CONFIG["format"] == "csv":
+        hh_to_csv(top)
+    else:
+        print_hh_report(filename, top, summary)
+
+
 def print_formatted(
         filename: str, counts: Dict[str, int], sorted_items: List[Tuple[str, int]]) -> None:
     """Selects the correct output format based on CONFIG."""
@@ -231,6 +596,8 @@ def print_formatted(
         to_json(counts)
     elif fmt == "csv":
         to_csv(sorted_items)
+    elif fmt == "binary":
+        to_binary(counts)
     else:
         print_report(filename, counts, sorted_items)
 
@@ -239,14 +606,185 @@ def print_formatted(
 # =============================================================================
 
 
+def count_file(filepath: str) -> Dict[str, int]:
+    """Worker: Runs the full pipeline (File -> Words -> Filtered) on one file."""
+    if CONFIG["engine"] == "mmap":
+        return count_blocks(stream_blocks(filepath, CONFIG["block_bytes"]))
+    stream = stream_filter(stream_words(stream_lines(filepath)))
+    return count_from_stream(stream)
+
+
+def count_range(span: Tuple[str, int, int]) -> Dict[str, int]:
+    """Worker: Runs the pipeline over one (filepath, start, end) byte range."""
+    lines = stream_range_lines(*span)
+    return count_from_stream(stream_filter(stream_words(lines)))
+
+
+def stream_files(files: List[str]) -> Iterator[str]:
+    """Pipeline: Filtered words of several files as one serial stream."""
+    lines = chain.from_iterable(stream_lines(p) for p in files)
+    return stream_filter(stream_words(lines))
+
+
+def count_corpus_serial(files: List[str]) -> Dict[str, int]:
+    """Reference path: Streams every file through a single pipeline."""
+    return count_from_stream(stream_files(files))
+
+
+def init_worker(policy: Dict[str, Any]) -> None:
+    """Pool initializer: Installs the parent's policy in a worker process."""
+    CONFIG.update(policy)
+
+
+def worker_policy() -> Dict[str, Any]:
+    """Snapshot of the policy keys a worker needs (survives spawn/fork)."""
+    ensure_policy()
+    keys = ("stopwords", "punct", "policy_loaded", "engine", "block_bytes")
+    return {k: CONFIG[k] for k in keys}
+
+
+def make_pool(workers: int) -> "ProcessPoolExecutor":
+    """Process pool whose workers share the parent's policy."""
+    from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+    return ProcessPoolExecutor(workers, initializer=init_worker,
+                               initargs=(worker_policy(),))
+
+
+def pool_count(task: Callable[[Any], Dict[str, int]], items: List[Any],
+               workers: int) -> Dict[str, int]:
+    """Maps a counting task over a process pool, merging results in order."""
+    chunksize = max(1, len(items) // (workers * 4))
+    with make_pool(workers) as pool:
+        return merge_counts(pool.map(task, items, chunksize=chunksize))
+
+
+def count_corpus(files: List[str], workers: Optional[int]) -> Dict[str, int]:
+    """Fans files out to a process pool and merges the per-file counts."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(files) < 2:
+        return count_corpus_serial(files)
+    return pool_count(count_file, files, workers)
+
+
+def count_chunked(filepath: str, workers: Optional[int]) -> Dict[str, int]:
+    """Counts one large file as whitespace-aligned byte ranges in parallel."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return count_file(filepath)
+    spans = [(filepath, a, b) for a, b in byte_ranges(filepath, workers * 4)]
+    return pool_count(count_range, spans, workers)
+
+
+def input_files() -> List[str]:
+    """The files named by CONFIG: the corpus, or the single input file."""
+    if CONFIG["corpus"]:
+        return expand_corpus(CONFIG["corpus"])
+    return [CONFIG["file"]]
+
+
+def policy_fingerprint() -> str:
+    """Hashes the counting policy; a change invalidates every cached entry."""
+    import json  # pylint: disable=import-outside-toplevel
+    import hashlib  # pylint: disable=import-outside-toplevel
+    ensure_policy()
+    policy = json.dumps([sorted(CONFIG["stopwords"]), CONFIG["punct"]])
+    return hashlib.blake2b(policy.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def index_entry(filepath: str) -> Dict[str, Any]:
+    """Worker: Counts one file and records its change-detection keys."""
+    return {**file_stat(filepath), "hash": file_digest(filepath),
+            "counts": count_file(filepath)}
+
+
+def reuse_entry(entry: Optional[Dict[str, Any]],
+                filepath: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the cached entry if the file is unchanged, else None.
+    Same size + mtime is trusted; a touched file is re-hashed before recounting.
+    """
+    stat = file_stat(filepath)
+    if not entry or entry["size"] != stat["size"]:
+        return None
+    if entry["mtime"] != stat["mtime"] and entry["hash"] != file_digest(filepath):
+        return None
+    return {**entry, **stat}
+
+
+def index_entries(files: List[str], workers: Optional[int]) -> List[Dict[str, Any]]:
+    """Builds fresh index entries, in parallel when there are several files."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(files) < 2:
+        return [index_entry(p) for p in files]
+    with make_pool(workers) as pool:
+        return list(pool.map(index_entry, files))
+
+
+def update_index(files: List[str], index: Dict[str, Any]) -> Dict[str, Any]:
+    """Reuses unchanged entries, recounts stale ones and drops deleted files."""
+    fingerprint = policy_fingerprint()
+    cached = index.get("files", {}) if index.get("policy") == fingerprint else {}
+    keys = [os.path.abspath(p) for p in files]
+    entries = {k: reuse_entry(cached.get(k), k) for k in keys}
+    stale = [k for k, e in entries.items() if e is None]
+    entries.update(zip(stale, index_entries(stale, CONFIG["workers"])))
+    return {"policy": fingerprint, "files": entries}
+
+
+def count_indexed(files: List[str], index_path: str) -> Dict[str, int]:
+    """
+    Incremental run: merges cached per-file counts in file order. Files no
+    longer present are simply not merged, which subtracts their counts while
+    keeping first-seen order identical to a from-scratch run.
+    """
+    index = update_index(files, load_index(index_path))
+    save_index(index_path, index)
+    return merge_counts(e["counts"] for e in index["files"].values())
+
+
+def count_input() -> Dict[str, int]:
+    """Dispatcher: Picks the counting strategy selected by CONFIG."""
+    if CONFIG["index_file"]:
+        return count_indexed(input_files(), CONFIG["index_file"])
+    if CONFIG["corpus"]:
+        return count_corpus(expand_corpus(CONFIG["corpus"]), CONFIG["workers"])
+    if CONFIG["chunked"]:
+        return count_chunked(CONFIG["file"], CONFIG["workers"])
+    return count_file(CONFIG["file"])
+
+
+def rank_items(counts: Dict[str, int]) -> List[Tuple[str, int]]:
+    """Ranks only as much as the selected format will print."""
+    if CONFIG["format"] in ("json", "binary"):
+        return []  # These dump the raw counts; no ranking needed
+    if CONFIG["format"] == "csv" and not CONFIG["csv_top_n"]:
+        return get_sorted_items(counts)
+    return get_top_items(counts, CONFIG["top_n"])
+
+
+def run_profiled(source: str) -> Dict[str, Any]:
+    """Runs the serial pipeline under wc_profile, handing it each stage."""
+    import wc_profile  # pylint: disable=import-outside-toplevel
+    stages = {"lines": stream_lines, "words": stream_words, "filter": stream_filter,
+              "count": count_from_stream, "rank": rank_items, "format": print_formatted}
+    return wc_profile.run_profiled(stages, input_files(), source, CONFIG["profile_file"])
+
+
 def run() -> None:
     """Orchestrates the data pipeline (SoC)."""
-    # Pipeline: Chain generators lazily (File -> Words -> Filtered)
-    stream = stream_filter(stream_words(stream_lines(CONFIG["file"])))
+    ensure_policy()
+    source = CONFIG["corpus"] or CONFIG["file"]
+    if CONFIG["heavy_hitters"]:
+        summary = summarize_stream(stream_files(input_files()), CONFIG["hh_capacity"])
+        print_hh_formatted(source, summary)
+        return
+    if CONFIG["profile"]:
+        run_profiled(source)
+        return
 
     # Execution & Presentation
-    counts = count_from_stream(stream)
-    print_formatted(CONFIG["file"], counts, get_sorted_items(counts))
+    counts = count_input()
+    print_formatted(source, counts, rank_items(counts))
 
 
 if __name__ == "__main__":
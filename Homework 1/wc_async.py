@@ -0,0 +1,166 @@
+#!/usr/bin/env python3 -B
+"""
+Asyncio ingestion for the wc0_fixed pipeline
+Course: CSC491/591 SW Guru
+Heuristics Applied: SoC, Streaming, Small Functions, Mechanism vs Policy
+
+Async twins of stream_lines -> stream_words -> stream_filter ->
+count_from_stream. Items flowing between async stages are batches (a
+block of whole lines, then a list of words) so each await moves thousands
+of words rather than one. Many sources (files, FIFOs, or local Unix sockets
+written as "unix:/path/to.sock") are read concurrently, at most
+ASYNC_CONFIG["concurrency"] at a time. Each source reads into a bounded
+queue, so a fast reader waits for its consumer instead of buffering
+everything (backpressure). Per-source counts are merged in source order,
+giving exactly the counts (and tie order) of the serial corpus path.
+
+Usage: python3 wc_async.py SOURCE [SOURCE ...]
+"""
+
+import sys
+import asyncio
+from typing import AsyncIterator, Dict, List, Any, Optional
+from wc0_fixed import (CONFIG, clean_word, ensure_policy, merge_counts,
+                       print_formatted, rank_items)
+
+ASYNC_CONFIG: Dict[str, Any] = {
+    "concurrency": 64,        # sources read at the same time
+    "queue_blocks": 16,       # bounded queue between reader and tokenizer
+    "read_bytes": 1 << 16,    # bytes of whole lines per read
+}
+
+DONE = object()  # queue sentinel: the source is exhausted
+
+# =============================================================================
+# ASYNC SOURCES
+# =============================================================================
+
+
+async def astream_file_lines(filepath: str) -> AsyncIterator[str]:
+    """Async generator: Reads blocks of whole lines of a file/FIFO in a thread."""
+    with open(filepath, encoding="utf-8") as f:
+        while lines := await asyncio.to_thread(f.readlines, ASYNC_CONFIG["read_bytes"]):
+            yield "".join(lines)
+
+
+async def asplit_lines(reader: asyncio.StreamReader) -> AsyncIterator[str]:
+    """Async generator: Re-cuts raw socket reads into blocks of whole lines."""
+    tail = b""
+    while data := await reader.read(ASYNC_CONFIG["read_bytes"]):
+        tail += data
+        cut = tail.rfind(b"\n") + 1
+        if cut:
+            yield tail[:cut].decode("utf-8")
+            tail = tail[cut:]
+    yield tail.decode("utf-8")
+
+
+async def astream_socket_lines(path: str) -> AsyncIterator[str]:
+    """Async generator: Yields blocks of lines sent over a local Unix socket."""
+    reader, writer = await asyncio.open_unix_connection(path)
+    try:
+        async for block in asplit_lines(reader):
+            yield block
+    finally:
+        writer.close()
+
+
+def astream_lines(source: str) -> AsyncIterator[str]:
+    """Picks the line source: "unix:PATH" is a socket, anything else a file."""
+    if source.startswith("unix:"):
+        return astream_socket_lines(source[len("unix:"):])
+    return astream_file_lines(source)
+
+# =============================================================================
+# BACKPRESSURE
+# =============================================================================
+
+
+async def pump(items: AsyncIterator[str], queue: asyncio.Queue) -> None:
+    """Producer task: Fills the bounded queue, then posts DONE (or the error).
+    Any Exception is forwarded, so the consumer never waits on a dead task."""
+    try:
+        async for item in items:
+            await queue.put(item)
+        await queue.put(DONE)
+    except Exception as ex:  # pylint: disable=broad-exception-caught
+        await queue.put(ex)
+
+
+async def abuffered(items: AsyncIterator[str], maxsize: int) -> AsyncIterator[str]:
+    """Async generator: Runs `items` ahead of the consumer by <= maxsize items."""
+    queue: asyncio.Queue = asyncio.Queue(maxsize)
+    producer = asyncio.create_task(pump(items, queue))
+    try:
+        while (item := await queue.get()) is not DONE:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
+
+# =============================================================================
+# ASYNC PIPELINE STAGES
+# =============================================================================
+
+
+async def astream_words(blocks: AsyncIterator[str]) -> AsyncIterator[List[str]]:
+    """Async twin of stream_words: tokenizes each block of lines."""
+    async for block in blocks:
+        yield block.lower().split()
+
+
+async def astream_filter(
+        raw_words: AsyncIterator[List[str]]) -> AsyncIterator[List[str]]:
+    """Async twin of stream_filter: cleans and removes stopwords per batch."""
+    ensure_policy()
+    stopwords = CONFIG["stopwords"]
+    async for words in raw_words:
+        yield [w for w in map(clean_word, words) if w and w not in stopwords]
+
+
+async def acount_from_stream(
+        word_stream: AsyncIterator[List[str]]) -> Dict[str, int]:
+    """Async twin of count_from_stream."""
+    counts: Dict[str, int] = {}
+    async for batch in word_stream:
+        for w in batch:
+            counts[w] = counts.get(w, 0) + 1
+    return counts
+
+# =============================================================================
+# CONTROLLER
+# =============================================================================
+
+
+async def acount_source(source: str, limit: asyncio.Semaphore) -> Dict[str, int]:
+    """Counts one source once a concurrency slot is free."""
+    async with limit:
+        lines = abuffered(astream_lines(source), ASYNC_CONFIG["queue_blocks"])
+        return await acount_from_stream(astream_filter(astream_words(lines)))
+
+
+async def acount_sources(sources: List[str],
+                         concurrency: Optional[int] = None) -> Dict[str, int]:
+    """Counts all sources concurrently and merges them in source order."""
+    limit = asyncio.Semaphore(concurrency or ASYNC_CONFIG["concurrency"])
+    parts = await asyncio.gather(*(acount_source(s, limit) for s in sources))
+    return merge_counts(parts)
+
+
+def count_sources(sources: List[str],
+                  concurrency: Optional[int] = None) -> Dict[str, int]:
+    """Sync entry point: runs the async pipeline to completion."""
+    return asyncio.run(acount_sources(sources, concurrency))
+
+
+def run(sources: List[str]) -> None:
+    """Counts the sources and prints them in CONFIG["format"]."""
+    counts = count_sources(sources)
+    print_formatted(", ".join(sources), counts, rank_items(counts))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    run(sys.argv[1:])
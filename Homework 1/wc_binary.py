@@ -0,0 +1,248 @@
+#!/usr/bin/env python3 -B
+"""
+Compact binary format for word-count results (.wcb)
+Course: CSC491/591 SW Guru
+Heuristics Applied: Mechanism vs Policy, Small Functions, Streaming
+
+Layout (all integers are unsigned LEB128 varints unless noted):
+    magic      b"WCB1"
+    header     varint length + UTF-8 JSON {"policy": {...}}
+    strings    per word, sorted: varint byte length + UTF-8 bytes
+    counts     per word, same order: varint count
+    trailer    struct "<QQ": number of words, byte size of `strings`
+
+Words are sorted by code point (which is also UTF-8 byte order), so any
+number of files can be merged in one streaming pass with heapq.merge.
+The trailer lets a writer stream without knowing the totals up front.
+
+Usage:
+    python3 wc_binary.py dump result.wcb
+    python3 wc_binary.py merge out.wcb a.wcb b.wcb [...]
+"""
+
+import sys
+import json
+import mmap
+import heapq
+import shutil
+import struct
+import tempfile
+from functools import partial
+from itertools import chain, groupby
+from typing import Iterator, Iterable, Dict, List, Tuple, Any, BinaryIO
+
+MAGIC = b"WCB1"
+TRAILER = struct.Struct("<QQ")
+CHUNK = 1 << 16   # bytes per read when streaming the count column
+
+# =============================================================================
+# ENCODING PRIMITIVES
+# =============================================================================
+
+
+def encode_varint(value: int) -> bytes:
+    """Encodes a non-negative int as LEB128 (7 bits per byte, high bit = more)."""
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def read_varint(f: BinaryIO) -> int:
+    """Decodes one LEB128 varint from a binary stream."""
+    shift = result = 0
+    while True:
+        byte = f.read(1)
+        if not byte:
+            raise EOFError("truncated varint")
+        result |= (byte[0] & 0x7F) << shift
+        if byte[0] < 0x80:
+            return result
+        shift += 7
+
+
+def decode_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    """Decodes one LEB128 varint at buf[pos]; returns (value, next pos)."""
+    shift = result = 0
+    for byte in buf[pos:pos + 10]:
+        pos, result = pos + 1, result | (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+    raise EOFError("truncated varint")
+
+
+def varints(data: Iterable[int]) -> Iterator[int]:
+    """Generator: decodes back-to-back varints from a stream of byte values."""
+    result = shift = 0
+    for byte in data:
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            yield result
+            result = shift = 0
+        else:
+            shift += 7
+
+
+def encode_word(word: str) -> bytes:
+    """One string-table entry: length prefix + UTF-8 bytes."""
+    raw = word.encode("utf-8")
+    return encode_varint(len(raw)) + raw
+
+# =============================================================================
+# WRITER
+# =============================================================================
+
+
+def write_header(f: BinaryIO, policy: Dict[str, Any]) -> None:
+    """Writes the magic number and the JSON header recording the policy."""
+    header = json.dumps({"policy": policy}, sort_keys=True).encode("utf-8")
+    f.write(MAGIC + encode_varint(len(header)) + header)
+
+
+def split_columns(f: BinaryIO, column: BinaryIO,
+                  records: Iterable[Tuple[str, int]]) -> Tuple[int, int]:
+    """Writes strings to `f` and counts to `column`; returns (words, bytes)."""
+    words = size = 0
+    for word, count in records:
+        entry = encode_word(word)
+        f.write(entry)
+        column.write(encode_varint(count))
+        words, size = words + 1, size + len(entry)
+    return words, size
+
+
+def write_records(f: BinaryIO, records: Iterable[Tuple[str, int]],
+                  policy: Dict[str, Any]) -> None:
+    """
+    Streams sorted (word, count) records: strings go straight to `f` while
+    the count column is spooled (to disk once large) and appended after.
+    """
+    write_header(f, policy)
+    with tempfile.SpooledTemporaryFile(max_size=1 << 24) as column:
+        words, size = split_columns(f, column, records)
+        column.seek(0)
+        shutil.copyfileobj(column, f)
+    f.write(TRAILER.pack(words, size))
+
+
+def write_counts(f: BinaryIO, counts: Dict[str, int],
+                 policy: Dict[str, Any]) -> None:
+    """Writes a counts dict in the binary format (vocabulary sorted)."""
+    write_records(f, ((w, counts[w]) for w in sorted(counts)), policy)
+
+
+def save_counts(path: str, counts: Dict[str, int],
+                policy: Dict[str, Any]) -> None:
+    """Convenience: write_counts to a file path."""
+    with open(path, "wb") as f:
+        write_counts(f, counts, policy)
+
+# =============================================================================
+# READER
+# =============================================================================
+
+
+def read_header(f: BinaryIO) -> Dict[str, Any]:
+    """Validates the magic number and returns the decoded JSON header."""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a word-count binary file (bad magic)")
+    return json.loads(f.read(read_varint(f)).decode("utf-8"))
+
+
+def read_trailer(f: BinaryIO) -> Tuple[int, int]:
+    """Returns (number of words, string table size) from the file's end."""
+    f.seek(-TRAILER.size, 2)
+    return TRAILER.unpack(f.read(TRAILER.size))
+
+
+def table_offsets(f: BinaryIO) -> Tuple[int, int, int]:
+    """Returns (number of words, string table offset, count column offset)."""
+    words, size = read_trailer(f)
+    f.seek(0)
+    read_header(f)
+    return words, f.tell(), f.tell() + size
+
+
+def iter_strings(buf: bytes, pos: int, words: int) -> Iterator[str]:
+    """Generator: walks `words` string-table entries of `buf` from `pos`."""
+    for _ in range(words):
+        length = buf[pos]
+        if length < 0x80:
+            pos += 1   # one-byte length: the common case, no decode call
+        else:
+            length, pos = decode_varint(buf, pos)
+        yield buf[pos:pos + length].decode("utf-8")
+        pos += length
+
+
+def iter_records(path: str) -> Iterator[Tuple[str, int]]:
+    """
+    Generator: Yields (word, count) in sorted order without loading the file.
+    The string table is walked through a memory map and the count column is
+    decoded from CHUNK-sized reads, side by side (no per-byte read calls).
+    """
+    with open(path, "rb") as f, open(path, "rb") as column, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        words, pos, start = table_offsets(f)
+        column.seek(start)
+        counts = varints(chain.from_iterable(iter(partial(column.read, CHUNK), b"")))
+        yield from zip(iter_strings(buf, pos, words), counts)
+
+
+def load_header(path: str) -> Dict[str, Any]:
+    """Reads only the header of a binary result file."""
+    with open(path, "rb") as f:
+        return read_header(f)
+
+
+def load_counts(path: str) -> Dict[str, int]:
+    """Reads a whole binary result file into a dict (alphabetical order)."""
+    return dict(iter_records(path))
+
+# =============================================================================
+# STREAMING MERGE
+# =============================================================================
+
+
+def merge_records(paths: List[str]) -> Iterator[Tuple[str, int]]:
+    """Generator: k-way merge of sorted files, summing counts per word."""
+    merged = heapq.merge(*(iter_records(p) for p in paths))
+    for word, group in groupby(merged, key=lambda r: r[0]):
+        yield word, sum(count for _, count in group)
+
+
+def common_policy(paths: List[str]) -> Dict[str, Any]:
+    """Returns the shared policy, refusing to mix differently-counted files."""
+    policies = [load_header(p)["policy"] for p in paths]
+    if any(p != policies[0] for p in policies):
+        raise ValueError("cannot merge results counted under different policies")
+    return policies[0]
+
+
+def merge_files(out_path: str, paths: List[str]) -> None:
+    """Merges two or more result files into one, holding O(k) records in memory."""
+    policy = common_policy(paths)
+    with open(out_path, "wb") as f:
+        write_records(f, merge_records(paths), policy)
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+
+def main(argv: List[str]) -> None:
+    """Tiny CLI: `dump FILE` prints JSON, `merge OUT IN...` merges files."""
+    if argv[:1] == ["dump"] and len(argv) == 2:
+        print(json.dumps({"header": load_header(argv[1]),
+                          "counts": load_counts(argv[1])}, indent=2))
+    elif argv[:1] == ["merge"] and len(argv) >= 4:
+        merge_files(argv[1], argv[2:])
+    else:
+        sys.exit(__doc__)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3 -B
+"""
+Per-stage profiling for the wc0_fixed pipeline
+Course: CSC491/591 SW Guru
+Heuristics Applied: SoC, Small Functions, Streaming
+
+Opt-in (CONFIG["profile"] = True): run() then hands the serial pipeline's
+stage functions to run_profiled(), which runs them with every stage wrapped:
+
+    lines -> words -> filter -> count -> rank -> format
+
+Streaming stages are timed per next() call. Those times are inclusive
+(pulling a word also pulls its line), so each stage's "self" time is its
+time minus its upstream's. Peak memory comes from tracemalloc: the four
+streaming stages run interleaved and therefore share one peak (scope
+"pipeline"); rank and format each get their own. Timing every item costs
+real time, so absolute numbers are inflated; compare stages, not runs.
+
+Nothing here is imported unless profiling is on, so the disabled cost is
+a single CONFIG lookup in run(). This module never imports wc0_fixed: the
+stages come in as a dict keyed by STAGES names, so there is no import cycle.
+
+Output: the normal report on stdout, a JSON report in CONFIG["profile_file"]
+and a human summary on stderr.
+"""
+
+import os
+import sys
+import json
+import tracemalloc
+from time import perf_counter
+from itertools import chain
+from typing import Iterator, Iterable, Callable, Dict, List, Any
+
+STREAMING = ("lines", "words", "filter", "count")
+STAGES = STREAMING + ("rank", "format")
+DONE = object()  # end-of-stream marker for timed()
+
+# =============================================================================
+# INSTRUMENTATION
+# =============================================================================
+
+
+def stage(report: Dict[str, Any], name: str) -> Dict[str, Any]:
+    """Returns the stats record of one stage."""
+    return report["stages"][name]
+
+
+def timed(report: Dict[str, Any], name: str, items: Iterable[Any]) -> Iterator[Any]:
+    """Generator: Passes items through, timing every next() on the source."""
+    stats, it = stage(report, name), iter(items)
+    while True:
+        start = perf_counter()
+        item = next(it, DONE)
+        stats["seconds"] += perf_counter() - start
+        if item is DONE:
+            return
+        stats["items"] += 1
+        yield item
+
+
+def measure(report: Dict[str, Any], name: str,
+            fn: Callable[..., Any], *args: Any) -> Any:
+    """Times one eager stage call and records the peak memory it reached."""
+    tracemalloc.reset_peak()
+    start = perf_counter()
+    result = fn(*args)
+    stats = stage(report, name)
+    stats["seconds"] += perf_counter() - start
+    stats["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    return result
+
+# =============================================================================
+# REPORT
+# =============================================================================
+
+
+def new_report(files: List[str]) -> Dict[str, Any]:
+    """Empty report for a run over `files`, stages in pipeline order."""
+    return {"files": files, "bytes_read": sum(os.path.getsize(p) for p in files),
+            "stages": {name: {"items": 0, "seconds": 0.0} for name in STAGES}}
+
+
+def finish_stage(stats: Dict[str, Any], upstream: float) -> None:
+    """Derives self time and throughput from the inclusive timing."""
+    stats["self_seconds"] = max(0.0, stats["seconds"] - upstream)
+    rate_time = stats["self_seconds"] or stats["seconds"]
+    stats["items_per_sec"] = stats["items"] / rate_time if rate_time else 0.0
+
+
+def finish(report: Dict[str, Any], wall: float) -> Dict[str, Any]:
+    """Fills in self times, rates and the shared pipeline memory peak."""
+    stages, upstream = report["stages"], 0.0
+    for name in STREAMING:
+        finish_stage(stages[name], upstream)
+        upstream = stages[name]["seconds"]
+        stages[name].update(peak_bytes=stages["count"]["peak_bytes"], memory_scope="pipeline")
+    for name in ("rank", "format"):
+        finish_stage(stages[name], 0.0)
+    io_time = stages["lines"]["seconds"]
+    stages["lines"]["bytes_per_sec"] = report["bytes_read"] / io_time if io_time else 0.0
+    report["wall_seconds"] = wall
+    return report
+
+
+def print_summary(report: Dict[str, Any]) -> None:
+    """Human-readable table of the report, on stderr."""
+    err = sys.stderr
+    print(f"\nPROFILE: {report['bytes_read']:,} bytes in {report['wall_seconds']:.3f}s",
+          file=err)
+    print(f"{'stage':8} {'items':>10} {'self s':>9} {'items/s':>13} {'peak KiB':>10}", file=err)
+    for name, s in report["stages"].items():
+        print(f"{name:8} {s['items']:>10,} {s['self_seconds']:>9.4f} "
+              f"{s['items_per_sec']:>13,.0f} {s['peak_bytes'] / 1024:>10,.1f}", file=err)
+
+# =============================================================================
+# CONTROLLER
+# =============================================================================
+
+
+def profile_counts(report: Dict[str, Any], stages: Dict[str, Callable[..., Any]],
+                   files: List[str]) -> Dict[str, int]:
+    """The generator pipeline with every streaming stage wrapped."""
+    lines = timed(report, "lines", chain.from_iterable(stages["lines"](p) for p in files))
+    words = timed(report, "words", stages["words"](lines))
+    kept = timed(report, "filter", stages["filter"](words))
+    counts = measure(report, "count", stages["count"], kept)
+    stage(report, "count")["items"] = stage(report, "filter")["items"]
+    return counts
+
+
+def profile_output(report: Dict[str, Any], stages: Dict[str, Callable[..., Any]],
+                   source: str, counts: Dict[str, int]) -> None:
+    """Ranks and prints the counts, timing both stages."""
+    ranked = measure(report, "rank", stages["rank"], counts)
+    stage(report, "rank")["items"] = len(ranked)
+    measure(report, "format", stages["format"], source, counts, ranked)
+    stage(report, "format")["items"] = len(ranked) or len(counts)
+
+
+def run_profiled(stages: Dict[str, Callable[..., Any]], files: List[str],
+                 source: str, path: str) -> Dict[str, Any]:
+    """
+    Profiled twin of wc0_fixed.run(): `stages` maps each STAGES name to the
+    pipeline function for it. Returns the report and saves it to `path`.
+    """
+    report, start = new_report(files), perf_counter()
+    tracemalloc.start()
+    try:
+        profile_output(report, stages, source, profile_counts(report, stages, files))
+    finally:
+        tracemalloc.stop()
+    return save(finish(report, perf_counter() - start), path)
+
+
+def save(report: Dict[str, Any], path: str) -> Dict[str, Any]:
+    """Writes the JSON report and prints the summary."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_summary(report)
+    return report
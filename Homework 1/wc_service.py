@@ -0,0 +1,240 @@
+#!/usr/bin/env python3 -B
+"""
+Word-count service: a warm wc0_fixed pipeline behind HTTP or a Unix socket
+Course: CSC491/591 SW Guru
+Heuristics Applied: SoC, Mechanism vs Policy, Small Functions, Streaming
+
+The policy is loaded once at startup and shipped to a pool of worker
+processes, so a request pays neither interpreter start nor config parsing.
+Each document streams through stream_words -> stream_filter ->
+count_from_stream in a worker and comes back rendered by print_formatted
+(format=binary: the wc_binary.py format, as application/octet-stream).
+
+Usage:
+    python3 wc_service.py                      # http://127.0.0.1:8491
+    python3 wc_service.py 127.0.0.1:9000
+    python3 wc_service.py unix:/tmp/wc0.sock   # curl --unix-socket ...
+
+Endpoints:
+    POST /count?format=text|json|csv|binary&name=doc.txt   (body = document)
+    GET  /stats                                             (latency stats, JSON)
+"""
+
+import io
+import os
+import sys
+import json
+import socket
+import threading
+import socketserver
+from time import perf_counter
+from collections import deque
+from contextlib import redirect_stdout
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Tuple, Union
+import wc_binary
+from wc0_fixed import (CONFIG, ensure_policy, make_pool, stream_words,
+                       stream_filter, count_from_stream, print_formatted,
+                       rank_items, result_policy)
+
+SERVICE_CONFIG: Dict[str, Any] = {
+    "address": "127.0.0.1:8491",
+    "workers": None,            # None -> os.cpu_count()
+    "max_body": 64 << 20,       # largest accepted document, in bytes
+    "latency_window": 10000,    # requests kept for percentile stats
+}
+
+FORMATS = {"text": "text/plain; charset=utf-8",
+           "json": "application/json; charset=utf-8",
+           "csv": "text/csv; charset=utf-8",
+           "binary": "application/octet-stream"}
+
+# =============================================================================
+# WORKER (runs inside the process pool)
+# =============================================================================
+
+
+def render_document(text: str, fmt: str, name: str) -> bytes:
+    """Worker: Counts one document and renders it like run() would print it."""
+    CONFIG["format"] = fmt  # each pool process handles one task at a time
+    counts = count_from_stream(stream_filter(stream_words(io.StringIO(text))))
+    if fmt == "binary":
+        return render_binary(counts)
+    out = io.StringIO()
+    with redirect_stdout(out):
+        print_formatted(name, counts, rank_items(counts))
+    return out.getvalue().encode("utf-8")
+
+
+def render_binary(counts: Dict[str, int]) -> bytes:
+    """
+    The binary format in memory: print_formatted writes it to
+    sys.stdout.buffer, which redirect_stdout does not capture.
+    """
+    out = io.BytesIO()
+    wc_binary.write_counts(out, counts, result_policy())
+    return out.getvalue()
+
+# =============================================================================
+# LATENCY STATS
+# =============================================================================
+
+
+def new_stats(window: int) -> Dict[str, Any]:
+    """Thread-safe latency recorder: totals plus a sliding window."""
+    return {"lock": threading.Lock(), "served": 0, "errors": 0,
+            "recent": deque(maxlen=window)}
+
+
+def record(stats: Dict[str, Any], seconds: float, ok: bool = True) -> None:
+    """Records one request's latency (and whether it succeeded)."""
+    with stats["lock"]:
+        stats["served" if ok else "errors"] += 1
+        stats["recent"].append(seconds)
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Snapshot of the counters and window percentiles, in milliseconds."""
+    with stats["lock"]:
+        ordered = sorted(stats["recent"])
+        totals = {"served": stats["served"], "errors": stats["errors"]}
+    if not ordered:
+        return {**totals, "window": 0}
+    ms = {f"p{round(q * 100)}_ms": percentile(ordered, q) * 1000
+          for q in (0.5, 0.95, 0.99)}
+    return {**totals, "window": len(ordered), **ms,
+            "mean_ms": sum(ordered) / len(ordered) * 1000,
+            "max_ms": ordered[-1] * 1000}
+
+# =============================================================================
+# HTTP LAYER
+# =============================================================================
+
+
+class CountHandler(BaseHTTPRequestHandler):
+    """POST /count renders a document; GET /stats reports latency."""
+    server_version = "wc0-service/1.0"
+
+    def do_GET(self) -> None:
+        """GET /stats: the latency summary as JSON."""
+        if urlsplit(self.path).path != "/stats":
+            self.send_error(404)
+            return
+        self.reply(200, json.dumps(summarize(self.server.stats), indent=2), "json")
+
+    def do_POST(self) -> None:
+        """POST /count: times and records the request, then replies."""
+        began = perf_counter()
+        try:
+            status, body, fmt = self.count_request()
+        except (ValueError, UnicodeDecodeError) as ex:
+            status, body, fmt = 400, f"{ex}\n", "text"
+        record(self.server.stats, perf_counter() - began, status == 200)
+        self.reply(status, body, fmt)
+
+    def count_request(self) -> Tuple[int, Union[str, bytes], str]:
+        """Validates the request and runs the document through the pool."""
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        fmt, name = query.get("format", "text"), query.get("name", "document")
+        if url.path != "/count":
+            return 404, "unknown endpoint\n", "text"
+        if fmt not in FORMATS:
+            return 400, f"unknown format {fmt!r}\n", "text"
+        length = int(self.headers.get("Content-Length", 0))
+        if not 0 <= length <= SERVICE_CONFIG["max_body"]:
+            return 413, "document too large\n", "text"
+        text = self.rfile.read(length).decode("utf-8")
+        return self.render(text, fmt, name)
+
+    def render(self, text: str, fmt: str, name: str) -> Tuple[int, Union[str, bytes], str]:
+        """Runs one document through the pool; a worker failure is a 500."""
+        try:
+            return 200, self.server.pool.submit(render_document, text, fmt, name).result(), fmt
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            return 500, f"worker failed: {ex!r}\n", "text"
+
+    def reply(self, status: int, body: Union[str, bytes], fmt: str) -> None:
+        """Sends one complete response with its Content-Type and length."""
+        data = body if isinstance(body, bytes) else body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", FORMATS[fmt])
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        pass  # latency is reported through /stats instead of access logs
+
+
+class CountServer(ThreadingHTTPServer):
+    """The threaded HTTP server plus the worker pool and stats its handlers share."""
+
+    def __init__(self, address: Any) -> None:
+        super().__init__(address, CountHandler)
+        self.pool = None  # bound by start() once the socket is up
+        self.stats = new_stats(SERVICE_CONFIG["latency_window"])
+
+
+class UnixHTTPServer(CountServer):
+    """The same HTTP service on a Unix domain socket."""
+    address_family = socket.AF_UNIX
+
+    def server_bind(self) -> None:
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)  # stale socket from a dead daemon
+        socketserver.TCPServer.server_bind(self)
+        self.server_name, self.server_port = "localhost", 0
+
+# =============================================================================
+# CONTROLLER
+# =============================================================================
+
+
+def make_server(address: str) -> CountServer:
+    """Builds a threaded server for "unix:PATH" or "HOST:PORT"."""
+    if address.startswith("unix:"):
+        return UnixHTTPServer(address[len("unix:"):])
+    host, _, port = address.rpartition(":")
+    return CountServer((host or "127.0.0.1", int(port)))
+
+
+def start(address: str) -> CountServer:
+    """Loads the policy once, then binds the server and its worker pool."""
+    ensure_policy()
+    server = make_server(address)
+    server.pool = make_pool(SERVICE_CONFIG["workers"] or os.cpu_count() or 1)
+    return server
+
+
+def stop(server: CountServer) -> None:
+    """Closes the socket, the worker pool and any Unix socket file."""
+    server.server_close()
+    server.pool.shutdown()
+    if server.address_family == socket.AF_UNIX and os.path.exists(server.server_address):
+        os.remove(server.server_address)
+
+
+def serve(address: str) -> None:
+    """Runs the daemon until interrupted."""
+    server = start(address)
+    print(f"[INFO] wc0 service listening on {address}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop(server)
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1] if len(sys.argv) > 1 else SERVICE_CONFIG["address"])
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""Benchmarks for checks.py on synthetic page-blocks-like tables.
+
+    python3 bench_checks.py [A] [B] [pool]
+    python3 bench_checks.py suite [--rows N...] [--widths W...] [--save]
+
+A: check A (identical features) as columns grow, one dict of columns
+   keyed on their raw cells (`hashed`: check_A hashes every column
+   itself) vs the old all-pairs comparison.
+B: check B (correlated features) as columns grow from 13 to 500.
+   `pairwise` is the old per-pair loop (rebuild xs/ys, then pearson),
+   kept here as the baseline; it is skipped above BENCH['pairwise_max']
+   columns. `matrix` is checks.correlations.
+pool: C, G and I serially vs pool_checks.outliers at 1, 2, 4, ... workers
+   (up to the CPU count) on a BENCH['pool_rows'] x BENCH['pool_width'] table.
+suite: the regression suite. Writes page-blocks-shaped CSVs (same 13
+   columns plus optional extra ones, with injected ?, outliers,
+   duplicates, class conflicts, broken AREA/ECCEN and implausible values)
+   at each --rows (10K by default; BENCH['suite_rows'] lists 1M and 10M)
+   and --widths, plus the real page_blocks_dirty.csv. Each file runs in a
+   fresh process that times loading and every check A-K, with rows/s and
+   the process's peak RSS after each step. It also times `checks.py stream`
+   and checks that it, and H's on-disk spill paths, give the in-memory
+   answers. Then EDGES, small hand-made tables, must give what the
+   original checks.py printed for them, BENCH['fuzz'] seeded random
+   tables with gaps must give check B's per-pair answer, and a file of
+   repeated rows with text cells must give the same A, D, E, H, J and K
+   in `stream` mode at tiny block sizes as in memory. Results go to
+   BENCH['results'] as JSON. Exit status 1 if any output differs (from out/ for the real
+   file, from the baseline digests for generated ones) or any step is more
+   than --threshold slower than BENCH['baseline']. --save makes this run
+   the baseline. Timings are compared in units of a fixed pure-Python
+   workload timed in the same process (`calibrate`), not in seconds, so a
+   baseline saved on one machine still holds on a faster or slower one."""
+import io
+import os
+import sys
+import csv
+import json
+import time
+import random
+import hashlib
+import argparse
+import resource
+from itertools import compress
+from multiprocessing import get_context
+from concurrent.futures import ProcessPoolExecutor
+import checks
+import pool_checks
+import stream_checks
+
+BENCH = dict(rows=5000, widths=[13, 50, 100, 200, 500], pairwise_max=100,
+             missing=0.01, seed=1, pool_rows=200_000, pool_width=50,
+             suite_rows=[10_000, 1_000_000, 10_000_000], suite_widths=[13],
+             threshold=0.25, noise_secs=0.05, data_dir='/tmp/bench_checks',
+             results='bench_checks.json', baseline='bench_checks_baseline.json',
+             real='page_blocks_dirty.csv', fuzz=400, calibrate=15,
+             inject=dict(missing=0.005, outlier=0.002, duplicate=0.01,
+                         conflict=0.002, broken=0.002, implausible=0.001))
+
+# ── Synthetic Data ───────────────────────────────────────────────
+def wide_table(rows, width):
+    """`width` numeric columns + class!. Every 4th column is a noisy copy
+    of the one before (so B has work to do); every 10th has gaps."""
+    rnd = random.Random(BENCH['seed'])
+    headers = [f"F{j}" for j in range(width)] + [checks.CLASS]
+    cols, prev = [], []
+    for j in range(width):
+        if j % 4 == 3:
+            col = [2 * x + rnd.gauss(0, 0.1) for x in prev]
+        else:
+            col = [rnd.lognormvariate(3, 1) for _ in range(rows)]
+        prev = col
+        gaps = BENCH['missing'] if j % 10 == 9 else 0
+        cols.append([checks.MISSING if rnd.random() < gaps else f"{x:.3f}" for x in col])
+    cols.append([str(rnd.randint(1, 5)) for _ in range(rows)])
+    t = checks.Table(headers)
+    t.add(list(zip(*cols)))
+    return t
+
+HEADERS = ['HEIGHT', 'LENGHT', 'WIDTH', 'AREA', 'ECCEN', 'P_BLACK', 'P_AND',
+           'MEAN_TR', 'BLACKPIX', 'BLACKAND', 'WB_TRANS', 'DATASET_ID', checks.CLASS]
+
+def block_row(rnd):
+    """One plausible, self-consistent page block (as numbers)."""
+    h, l = rnd.randint(1, 30), rnd.randint(1, 600)
+    area = h * l
+    bpx = rnd.randint(1, area)
+    band = rnd.randint(bpx, area)
+    return [h, l, l, area, l / h, bpx / area, band / area, rnd.uniform(1, 5),
+            bpx, band, rnd.randint(1, bpx), 1,
+            rnd.choices('12345', weights=[90, 6, 1, 1, 2])[0]]
+
+def text(row):
+    h, l, w, a, e, pb, pa, mt, *rest = row
+    return [str(h), str(l), str(w), str(a), f"{e:.3f}", f"{pb:.3f}", f"{pa:.3f}",
+            f"{mt:.2f}"] + [str(x) for x in rest]
+
+def dirty_rows(n, width, rnd):
+    """Yield n csv rows of `width` columns with BENCH['inject'] faults.
+    Duplicates and conflicts repeat a recent row exactly (gaps included)."""
+    odds, recent = BENCH['inject'], []
+    for _ in range(n):
+        roll = rnd.random()
+        if recent and roll < odds['duplicate']:
+            row = list(rnd.choice(recent))
+        elif recent and roll < odds['duplicate'] + odds['conflict']:
+            row = list(rnd.choice(recent))
+            row[-1] = rnd.choice([c for c in '12345' if c != row[-1]])
+        else:
+            row = fresh_row(width, rnd)
+        recent = (recent + [row])[-100:]
+        yield row
+
+def fresh_row(width, rnd):
+    odds = BENCH['inject']
+    row = text(block_row(rnd))
+    if rnd.random() < odds['outlier']:
+        j = rnd.randrange(11)
+        row[j] = str(float(row[j]) * 1000)
+    if rnd.random() < odds['broken']:
+        row[3 if rnd.random() < 0.5 else 4] = '1'
+    if rnd.random() < odds['implausible']:
+        row[0 if rnd.random() < 0.5 else -1] = rnd.choice(['0', '9'])
+    row = [checks.MISSING if rnd.random() < odds['missing'] else v for v in row]
+    row[2] = row[1]   # WIDTH is always LENGHT, as in the real file (check A)
+    return row[:-1] + extra_cells(row, width - len(HEADERS), rnd) + row[-1:]
+
+def extra_cells(row, k, rnd):
+    """Widening: noisy copies of the numeric columns, every 5th exact."""
+    return [row[j % 11] if j % 5 == 4 or row[j % 11] == checks.MISSING else
+            f"{float(row[j % 11]) * 2 + rnd.gauss(0, 1):.3f}" for j in range(k)]
+
+def dataset(rows, width):
+    """Path of the generated CSV, written once per (rows, width, seed)."""
+    os.makedirs(BENCH['data_dir'], exist_ok=True)
+    path = os.path.join(BENCH['data_dir'], f"pages_{rows}x{width}_{BENCH['seed']}.csv")
+    if not os.path.exists(path):
+        rnd = random.Random(BENCH['seed'])
+        with open(path + '.tmp', 'w', newline='') as f:
+            out = csv.writer(f, lineterminator='\n')
+            out.writerow(HEADERS[:-1] + [f"X{j}" for j in range(width - len(HEADERS))]
+                         + HEADERS[-1:])
+            out.writerows(dirty_rows(rows, width, rnd))
+        os.replace(path + '.tmp', path)
+    return path
+
+# ── Baselines ────────────────────────────────────────────────────
+def check_A_pairwise(t):
+    headers = t.headers
+    found = set()
+    for i in range(len(headers)):
+        for j in range(i + 1, len(headers)):
+            h1, h2 = headers[i], headers[j]
+            if t.same(h1, h2):
+                found.update([h1, h2])
+    return found
+
+def check_B_pairwise(t):
+    headers = [h for h in t.headers if h != checks.CLASS]
+    found = set()
+    for i in range(len(headers)):
+        for j in range(i + 1, len(headers)):
+            h1, h2 = headers[i], headers[j]
+            both = bytes(a & b for a, b in zip(t.have[h1], t.have[h2]))
+            xs = list(compress(t.vals[h1], both))
+            ys = list(compress(t.vals[h2], both))
+            if xs and abs(checks.pearson(xs, ys)) > 0.95:
+                found.update([h1, h2])
+    return found
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t0, result
+
+# ── Benchmarks ───────────────────────────────────────────────────
+def bench_A():
+    print(f"A: {BENCH['rows']:,} rows")
+    for width in BENCH['widths']:
+        t = wide_table(BENCH['rows'], width)
+        secs, found = timed(checks.check_A, t)
+        base, expected = timed(check_A_pairwise, t)
+        assert found == expected, width
+        print(f"  {width:>4} cols  hashed {secs:8.4f}s  pairwise {base:8.4f}s"
+              f"  x{base / secs:6.1f}")
+
+def bench_B():
+    print(f"B: {BENCH['rows']:,} rows")
+    for width in BENCH['widths']:
+        t = wide_table(BENCH['rows'], width)
+        pairs = width * (width - 1) // 2
+        secs, found = timed(checks.check_B, t)
+        line = f"  {width:>4} cols {pairs:>7,} pairs  matrix {secs:8.3f}s"
+        if width <= BENCH['pairwise_max']:
+            base, expected = timed(check_B_pairwise, t)
+            assert found == expected, width
+            line += f"  pairwise {base:8.3f}s  x{base / secs:5.1f}"
+        print(line)
+
+def serial_outliers(t):
+    return {name: checks.DISPATCH[name](t) for name in 'CGI'}
+
+def bench_pool():
+    t = wide_table(BENCH['pool_rows'], BENCH['pool_width'])
+    print(f"pool: C, G, I on {t.n:,} rows x {BENCH['pool_width']} cols")
+    base, expected = timed(serial_outliers, t)
+    print(f"  serial      {base:8.3f}s")
+    workers, cpus = 1, os.cpu_count() or 1
+    while workers <= cpus:
+        secs, found = timed(pool_checks.outliers, t, workers)
+        assert found == expected, workers
+        print(f"  {workers:>3} workers {secs:8.3f}s  x{base / secs:5.1f}")
+        workers *= 2
+
+BENCHMARKS = dict(A=bench_A, B=bench_B, pool=bench_pool)
+
+# ── Edge Cases ───────────────────────────────────────────────────
+# name: (csv text, {check: what the original checks.py printed}).
+EDGES = {
+    # Y's shared rows are where X is constant: Sxx cancels to < 0
+    'B constant on shared rows': ('X,Y,class!\n1.1,1,1\n1.1,2,2\n1.1,3,1\n5.3,?,2\n7.9,?,1\n',
+                                  {'B': set()}),
+    # A and H compare cells as text: class! included, 7 != 7.0, 0 != -0
+    'A class! equals a feature': ('X,Y,Z,class!\n1,2,3,1\n2,2,4,2\n3,5,4,3\n',
+                                  {'A': {'X', 'class!'}, 'H': set()}),
+    'H 7 vs 7.0': ('X,Y,class!\n7,1,1\n7.0,1,2\n', {'A': set(), 'H': set()}),
+    'A and H 0 vs -0': ('X,Y,Z,class!\n0,-0,5,1\n-0,-0,5,2\n1,1,6,1\n',
+                        {'A': set(), 'H': set()}),
+}
+
+def table_of(text):
+    rows = list(csv.reader(io.StringIO(text)))
+    t = checks.Table(rows[0])
+    t.add(rows[1:])
+    return t
+
+def small_table(rnd):
+    """2-4 columns x 2-9 rows drawn mostly from 3 values, ~30% ?."""
+    width, common = rnd.randint(2, 4), [f"{rnd.uniform(0, 10):.1f}" for _ in range(3)]
+    rows = [[checks.MISSING if rnd.random() < 0.3 else
+             rnd.choice(common + [f"{rnd.uniform(0, 100):.3f}"]) for _ in range(width)]
+            + [rnd.choice('12')] for _ in range(rnd.randint(2, 9))]
+    return table_of('\n'.join(','.join(r) for r in
+                              [[f"X{j}" for j in range(width)] + [checks.CLASS]] + rows))
+
+def text_cells_file(rnd, rows=60):
+    """Page-blocks headers over 8 repeated rows of 0/-0/1/1.0/2/?/text cells
+    with random labels, so H groups and equal columns span blocks."""
+    cells = ['0', '-0', '1', '1.0', '2', checks.MISSING, 'abc']
+    base = [[rnd.choice(cells) for _ in HEADERS[:-1]] for _ in range(8)]
+    for row in base:
+        row[2] = row[1]
+    os.makedirs(BENCH['data_dir'], exist_ok=True)
+    path = os.path.join(BENCH['data_dir'], f"text_cells_{BENCH['seed']}.csv")
+    with open(path, 'w', newline='') as f:
+        out = csv.writer(f, lineterminator='\n')
+        out.writerow(HEADERS)
+        out.writerows(rnd.choice(base) + [rnd.choice('12345')] for _ in range(rows))
+    return path
+
+STREAM_EXACT = 'ADEHJK'   # C, G, I and B agree to ~1e-12 only (stream_checks.py)
+
+def edge_problems():
+    """EDGES against their known answers, then BENCH['fuzz'] random small
+    tables: check B against the per-pair method."""
+    problems = []
+    for name, (text, want) in EDGES.items():
+        t = table_of(text)
+        for check, found in want.items():
+            try:
+                got = checks.DISPATCH[check](t)
+            except Exception as ex:   # a crash is a wrong answer too
+                got = ex
+            if got != found:
+                problems.append(f"edge {name!r} {check}: {got!r}, want {sorted(found)}")
+    rnd = random.Random(BENCH['seed'])
+    for k in range(BENCH['fuzz']):
+        t = small_table(rnd)
+        try:
+            ok = checks.check_B(t) == check_B_pairwise(t)
+        except Exception:
+            ok = False
+        if not ok:
+            problems.append(f"fuzz table {k} B: differs from the per-pair method")
+    path = text_cells_file(rnd)
+    t = checks.load(path)
+    for size in (1, 2, 3, 4, 7):
+        streamed = stream_checks.run(path, size=size)
+        problems += [f"text cells, stream blocks of {size} {name}: differs from `all`"
+                     for name in STREAM_EXACT
+                     if streamed[name] != checks.DISPATCH[name](t)]
+    return problems
+
+# ── Regression Suite ─────────────────────────────────────────────
+def peak_rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # KiB on Linux
+
+def digest(found):
+    return hashlib.sha256(checks.format_res(found).encode()).hexdigest()[:16]
+
+def reference():
+    """A fixed mix of what the checks spend their time on: float sums,
+    dict buckets and splitting text."""
+    rnd = random.Random(0)
+    xs = [rnd.random() for _ in range(20_000)]
+    m, buckets = sum(xs) / len(xs), {}
+    for i, x in enumerate(xs):
+        buckets.setdefault(round(x, 3), []).append(i)
+    return sum((x - m) ** 2 for x in xs), ','.join(map(str, xs)).split(',')
+
+def calibrate():
+    """Seconds for one reference() on this machine, best of BENCH['calibrate']."""
+    return min(timed(reference)[0] for _ in range(BENCH['calibrate']))
+
+def measure(path):
+    """Run in a fresh process: time load and each check, in `all` order,
+    each also in units of calibrate()."""
+    unit = calibrate()
+    secs, t = timed(checks.load, path)
+    steps = {'load': dict(secs=secs, rows_per_sec=t.n / secs, peak_rss=peak_rss(),
+                          mb_per_sec=os.path.getsize(path) / secs / (1 << 20))}
+    every = {}
+    for name, check in checks.DISPATCH.items():
+        secs, every[name] = timed(check, t)
+        steps[name] = dict(secs=secs, rows_per_sec=t.n / secs if secs else 0.0,
+                           peak_rss=peak_rss(), found=len(every[name]),
+                           digest=digest(every[name]))
+    secs, streamed = timed(stream_checks.run, path)
+    steps['stream'] = dict(secs=secs, rows_per_sec=t.n / secs if secs else 0.0,
+                           peak_rss=peak_rss())
+    # the spill paths must agree too; 16 runs keeps the open temp files few
+    budget = max(1, t.n // 16)
+    agree = {'stream': streamed == every,
+             'H spilled': checks.check_H(t, budget) == every['H'],
+             'stream H spilled': stream_checks.run(path, budget)['H'] == every['H']}
+    for s in steps.values():
+        s['units'] = s['secs'] / unit
+    return dict(rows=t.n, cols=len(t.headers), bytes=os.path.getsize(path), unit=unit,
+                steps=steps, agree=agree)
+
+def expected_digests(key, baseline):
+    """Known-good output digests: out/ for the real file, else the baseline."""
+    if key == 'page_blocks':
+        digests = {}
+        for name in checks.DISPATCH:
+            with open(os.path.join('out', name), 'rb') as f:
+                digests[name] = hashlib.sha256(f.read()).hexdigest()[:16]
+        return digests
+    return {name: s['digest'] for name, s in baseline.get(key, {}).get('steps', {}).items()
+            if 'digest' in s}
+
+def compare(key, result, baseline, threshold):
+    """Problems with one dataset's result, as printable lines."""
+    problems, old = [], baseline.get(key, {}).get('steps', {})
+    for name, want in expected_digests(key, baseline).items():
+        if result['steps'][name]['digest'] != want:
+            problems.append(f"{key} {name}: output differs")
+    problems += [f"{key} {name}: output differs" for name, ok in result['agree'].items() if not ok]
+    for name, s in result['steps'].items():
+        base = old.get(name, {}).get('units')
+        slower = (s['units'] - base) * result['unit'] if base else 0.0
+        if slower > BENCH['noise_secs'] and s['units'] > base * (1 + threshold):
+            problems.append(f"{key} {name}: {s['units']:.1f} vs {base:.1f} units baseline "
+                            f"(1 unit = {result['unit'] * 1000:.1f} ms here)")
+    return problems
+
+def report(key, result):
+    print(f"{key}: {result['rows']:,} rows x {result['cols']} cols, "
+          f"{result['bytes'] / (1 << 20):.1f} MB, 1 unit = {result['unit'] * 1000:.1f} ms")
+    for name, s in result['steps'].items():
+        print(f"  {name:6} {s['secs']:9.3f}s {s['units']:8.2f} units "
+              f"{s['rows_per_sec']:14,.0f} rows/s {s['peak_rss'] / (1 << 20):9.1f} MB peak")
+
+def suite(argv):
+    ap = argparse.ArgumentParser(usage=__doc__.splitlines()[3].strip())
+    ap.add_argument('--rows', type=int, nargs='+', default=BENCH['suite_rows'][:1])
+    ap.add_argument('--widths', type=int, nargs='+', default=BENCH['suite_widths'])
+    ap.add_argument('--threshold', type=float, default=BENCH['threshold'])
+    ap.add_argument('--save', action='store_true')
+    a = ap.parse_args(argv)
+    paths = {'page_blocks': BENCH['real']}
+    paths.update({f"{rows}x{width}": dataset(rows, width)
+                  for rows in a.rows for width in a.widths})
+    baseline = {}
+    if os.path.exists(BENCH['baseline']):
+        with open(BENCH['baseline']) as f:
+            baseline = json.load(f)
+    results, problems = {}, []
+    for key, path in paths.items():
+        with ProcessPoolExecutor(1, mp_context=get_context('spawn')) as pool:
+            results[key] = pool.submit(measure, path).result()
+        report(key, results[key])
+        problems += compare(key, results[key], {} if a.save else baseline, a.threshold)
+    edges = edge_problems()
+    print(f"edges: {len(EDGES)} tables, {BENCH['fuzz']} fuzzed, {len(edges)} wrong")
+    problems += edges
+    with open(BENCH['results'], 'w') as f:
+        json.dump(results, f, indent=2)
+    if a.save:
+        with open(BENCH['baseline'], 'w') as f:
+            json.dump({**baseline, **results}, f, indent=2)
+    for line in problems:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if problems else 0
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['suite']:
+        sys.exit(suite(sys.argv[2:]))
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
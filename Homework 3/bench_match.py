@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Times the regex engines in match.py on synthetic log text.
+
+    python3 bench_match.py [scan] [prefilter]     (default: both)
+
+scan:      one long text of 1 KB, 100 KB, 10 MB. `slicing` is the book
+           version (a slice per step), kept here only as the baseline; it
+           is skipped above BENCH['slicing_max'] bytes because its copying
+           grows with the square of the text.
+prefilter: many log lines, one pattern and then a set of patterns, with
+           and without the literal prefilter / Aho-Corasick pass."""
+import sys
+import time
+import random
+import match
+
+BENCH = dict(sizes=[1 << 10, 100 << 10, 10 << 20], pattern='ERROR.*disk',
+             slicing_max=100 << 10, repeats=3, seed=1,
+             lines=200_000, set_lines=50_000, error_rate=0.01, set_size=40)
+
+# ── Baseline: the slicing matcher from Beautiful Code ────────────
+def sliced_match(regex, text):
+    if regex and regex[0] == '^':
+        return sliced_here(regex[1:], text)
+    for i in range(len(text) + 1):
+        if sliced_here(regex, text[i:]):
+            return True
+    return False
+
+def sliced_here(regex, text):
+    if not regex:
+        return True
+    if len(regex) >= 2 and regex[1] == '*':
+        return sliced_star(regex[0], regex[2:], text)
+    if regex == '$':
+        return text == ''
+    if text and (regex[0] == '.' or regex[0] == text[0]):
+        return sliced_here(regex[1:], text[1:])
+    return False
+
+def sliced_star(c, regex, text):
+    i = 0
+    while True:
+        if sliced_here(regex, text[i:]):
+            return True
+        if i < len(text) and (c == '.' or c == text[i]):
+            i += 1
+        else:
+            return False
+
+# ── Helpers ──────────────────────────────────────────────────────
+WORDS = 'GET POST worker request served cache miss hit disk slow ok'.split()
+
+def log_line(rnd, level='INFO'):
+    return (f"2024-03-{rnd.randint(1, 28):02d} {level} {rnd.choice(WORDS)} "
+            f"{rnd.choice(WORDS)} {rnd.randint(1, 999)}ms\n")
+
+def log_text(size):
+    """Log-like text with no ERROR lines, so every engine scans it all."""
+    rnd = random.Random(BENCH['seed'])
+    lines, n = [], 0
+    while n < size:
+        lines.append(log_line(rnd))
+        n += len(lines[-1])
+    return ''.join(lines)[:size]
+
+def log_lines(n):
+    """Log lines with a sprinkle of ERROR/WARN lines."""
+    rnd = random.Random(BENCH['seed'])
+    levels = ['ERROR', 'WARN']
+    return [log_line(rnd, rnd.choice(levels) if rnd.random() < BENCH['error_rate']
+                     else 'INFO') for _ in range(n)]
+
+def pattern_set(n):
+    """`n` patterns shaped like alert rules: LEVEL word.*word"""
+    rnd = random.Random(BENCH['seed'])
+    return [f"{rnd.choice(['ERROR', 'WARN', 'FATAL'])} {rnd.choice(WORDS)}"
+            f".*{rnd.choice(WORDS)}" for _ in range(n)]
+
+def best(fn):
+    times = []
+    for _ in range(BENCH['repeats']):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+ENGINES = {
+    'slicing':   lambda p, text, raw: sliced_match(p, text),
+    'offsets':   lambda p, text, raw: match.backtrack(p, text),
+    'dfa':       lambda p, text, raw: match.compile(p).match(text),
+    'dfa-bytes': lambda p, text, raw: match.compile(p).match(raw),
+}
+
+# ── Benchmarks ───────────────────────────────────────────────────
+def bench_scan():
+    p = BENCH['pattern']
+    print(f"pattern {p!r}, best of {BENCH['repeats']}")
+    for size in BENCH['sizes']:
+        text = log_text(size)
+        raw = text.encode()
+        expected = match.backtrack(p, text)
+        for name, run in ENGINES.items():
+            if name == 'slicing' and size > BENCH['slicing_max']:
+                print(f"  {size >> 10:>6} KB  {name:9}   skipped (quadratic)")
+                continue
+            secs, result = best(lambda: run(p, text, raw))
+            assert result == expected, name
+            print(f"  {size >> 10:>6} KB  {name:9} {secs:9.4f}s "
+                  f"{size / secs / (1 << 20):9.1f} MB/s")
+
+def timed_lines(label, lines, fn, expected):
+    secs, hits = best(lambda: sum(1 for line in lines if fn(line)))
+    assert hits == expected, label
+    print(f"  {label:24} {secs:8.3f}s {len(lines) / secs:12,.0f} lines/s  ({hits} hits)")
+
+def bench_prefilter():
+    lines = log_lines(BENCH['lines'])
+    p = match.compile(BENCH['pattern'])
+    expected = sum(1 for line in lines if match.backtrack(p.regex, line))
+    print(f"prefilter: {len(lines):,} log lines, pattern {p.regex!r}")
+    timed_lines('dfa only', lines, p.dfa.search, expected)
+    timed_lines('find + dfa', lines, p.match, expected)
+    lines = lines[:BENCH['set_lines']]
+    regexes = pattern_set(BENCH['set_size'])
+    ps = match.PatternSet(regexes)
+    dfas = [q.dfa.search for q in ps.patterns]
+    expected = sum(1 for line in lines if any(d(line) for d in dfas))
+    print(f"prefilter: {len(lines):,} lines, {len(regexes)} patterns (any match)")
+    timed_lines('dfa per pattern', lines, lambda l: any(d(l) for d in dfas), expected)
+    timed_lines('find + dfa per pattern', lines,
+                lambda l: any(q.match(l) for q in ps.patterns), expected)
+    timed_lines('aho-corasick set', lines, ps.match, expected)
+
+BENCHMARKS = dict(scan=bench_scan, prefilter=bench_prefilter)
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
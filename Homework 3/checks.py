@@ -1,7 +1,17 @@
 #!/usr/bin/env python3
+import os
 import sys
 import csv
 import math
+import heapq
+import struct
+import tempfile
+from bisect import bisect_right
+from array import array
+from hashlib import blake2b
+from operator import add, and_, mul
+from functools import partial
+from itertools import compress, groupby, islice, zip_longest
 
 MISSING = '?'
 
@@ -15,224 +25,493 @@ def sd(xs):
     mu = mean(xs)
     return math.sqrt(sum((x - mu)**2 for x in xs) / len(xs))
 
-def pearson(xs, ys):
-    if len(xs) != len(ys) or len(xs) < 1: return 0.0
-    mx, my = mean(xs), mean(ys)
-    num = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
-    dx  = sum((x - mx)**2 for x in xs)
-    dy  = sum((y - my)**2 for y in ys)
-    if dx == 0 or dy == 0:
+# `dot` runs its loop in C (map + operator.mul), which makes it
+# the pure-Python stand-in for a vectorized matrix product.
+def dot(xs, ys):
+    return sum(map(mul, xs, ys))
+
+if hasattr(math, 'sumprod'):  # Python 3.12+: one C call, no temporaries
+    dot = math.sumprod
+
+def centered(xs):
+    mu = mean(xs)
+    return [x - mu for x in xs]
+
+def ratio(num, dx, dy):
+    if dx <= 0 or dy <= 0:   # < 0 only as rounding of a zero variance
         return 0
     return num / math.sqrt(dx * dy)
 
-def print_res(found_set):
-    """Format and print results: length followed by sorted items."""
+def pearson(xs, ys):
+    if len(xs) != len(ys) or len(xs) < 1: return 0.0
+    dx, dy = centered(xs), centered(ys)
+    return ratio(dot(dx, dy), dot(dx, dx), dot(dy, dy))
+
+# ── Columnar Loader ──────────────────────────────────────────────
+# The CSV is parsed once into one typed column per feature:
+# `vals[h]` is an array('d') and `have[h]` a bytearray mask
+# (1 = value present, 0 = MISSING, stored as 0.0). A feature cell
+# that is not a number (text, an empty field) counts as not
+# present. class! is text only: `label` keeps the raw strings,
+# since E/K/H/I compare them as text. A and H compare cells as
+# text too (7 and 7.0, or 0 and -0, differ), as the original
+# did, so every column also keeps its raw cells: `text[h]` holds
+# one packed str per block (pack_cells), about the column's size
+# in the file (only when A or H will run: `cells=False` skips
+# it). Rows shorter than the header are padded with MISSING.
+# Row i of the table is line i + 2 of the file.
+
+BLOCK = 1 << 16   # rows transposed per step while loading
+CLASS = 'class!'
+VALID = {'1', '2', '3', '4', '5'}
+SEP = '\0'
+
+def pack_cells(col):
+    """A block of raw cells as one str, NUL-joined; as a tuple instead if
+    a cell holds a NUL itself (csv allows it), so unpacking is exact."""
+    packed = SEP.join(col)
+    return packed if packed.count(SEP) == len(col) - 1 else tuple(col)
+
+def unpack_cells(packed):
+    return packed.split(SEP) if isinstance(packed, str) else list(packed)
+
+class Table:
+    def __init__(self, headers, cells=True):
+        self.headers, self.n = headers, 0
+        feats = [h for h in headers if h != CLASS]
+        self.vals = {h: array('d') for h in feats}
+        self.have = {h: bytearray() for h in headers}
+        self.text = {h: [] for h in headers} if cells else None
+        self.starts = []   # first row of each block of `text`
+        self.label = []
+        self.memo = {}
+
+    def add(self, rows):
+        """Append a block of csv rows; short rows count as MISSING."""
+        cols = list(zip_longest(*rows, fillvalue=MISSING))
+        cols += [(MISSING,) * len(rows)] * (len(self.headers) - len(cols))
+        self.starts.append(self.n)
+        for h, col in zip(self.headers, cols):
+            self.have[h].extend(v != MISSING for v in col)
+            if self.text is not None:
+                self.text[h].append(pack_cells(col))
+            if h == CLASS:
+                self.label.extend(col)
+            else:
+                try:
+                    self.vals[h].extend([0.0 if v == MISSING else float(v) for v in col])
+                except ValueError:
+                    self.vals[h].extend(self.parse(h, col))
+        self.n += len(rows)
+
+    def parse(self, h, col):
+        """Slow path for a block with text in feature h: such cells are
+        marked not present."""
+        vals = []
+        for i, v in enumerate(col, self.n):
+            try:
+                vals.append(0.0 if v == MISSING else float(v))
+            except ValueError:
+                self.have[h][i] = 0
+                vals.append(0.0)
+        return vals
+
+    def same(self, h1, h2):
+        """Columns h1 and h2 hold the same text in every row."""
+        return self.text[h1] == self.text[h2]
+
+    def cells(self, h, b):
+        """Raw cells of block b of column h, as a list."""
+        return unpack_cells(self.text[h][b])
+
+    def digest(self, h):
+        """128-bit digest of column h's raw cells (stream mode's A buckets,
+        which cannot keep whole columns)."""
+        d = blake2b(digest_size=16)
+        for packed in self.text[h]:
+            d.update((packed if isinstance(packed, str) else repr(packed)).encode())
+        return d.digest()
+
+    def present(self, h, rows=None):
+        """Values of column h that are not MISSING (optionally only `rows`)."""
+        if rows is None:
+            return list(compress(self.vals[h], self.have[h]))
+        vals, have = self.vals[h], self.have[h]
+        return [vals[i] for i in rows if have[i]]
+
+    # Shared statistics: C and G both need every column's
+    # mean/sd, I needs them per class. Each is computed once per
+    # table, however many checks ask.
+    def classes(self):
+        """Row indices of each valid class!, in row order."""
+        if 'classes' not in self.memo:
+            by_class = {}
+            for i, c in enumerate(self.label):
+                if c in VALID:
+                    by_class.setdefault(c, []).append(i)
+            self.memo['classes'] = by_class
+        return self.memo['classes']
+
+    def moments(self, h, c=None):
+        """(mean, sd) of column h over all rows, or over class c."""
+        if (h, c) not in self.memo:
+            vals = self.present(h, None if c is None else self.classes()[c])
+            self.memo[h, c] = (mean(vals), sd(vals))
+        return self.memo[h, c]
+
+def load(path, scan=None, cells=True):
+    """Table of the csv at path; `scan` (scans.Scan) sees every line too.
+    cells=False keeps no raw cells (A and H cannot run on the table)."""
+    with open(path, newline='') as f:
+        rd = csv.reader(f if scan is None else scan.feed(f))
+        t = Table(next(rd), cells)
+        while block := [r for r in islice(rd, BLOCK) if r]:
+            t.add(block)
+    return t
+
+def format_res(found_set):
+    """Format results: length followed by sorted items, one per line."""
     res = list(found_set)
     # Ensure numerical sorting for row numbers, alphabetical for columns
     if all(isinstance(x, int) for x in res):
         res.sort()
     else:
         res.sort()
-    print(len(res))
-    for x in res:
-        print(x)
+    return ''.join(f"{x}\n" for x in [len(res)] + res)
 
 # ── Feature-Level Checks (A-E) ───────────────────────────────────
 
-def check_A(rows):
+def check_A(t):
     """A: Identical features — columns with the same values for every row."""
-    headers = list(rows[0].keys())
-    cols = {h: [r[h] for r in rows] for h in headers}
-    found = set()
-    for i in range(len(headers)):
-        for j in range(i + 1, len(headers)):
-            h1, h2 = headers[i], headers[j]
-            if cols[h1] == cols[h2]:
-                found.update([h1, h2])
-    print_res(found)
-
-def check_B(rows):
+    buckets = {}
+    for h in t.headers:   # keyed on the raw cells themselves, so a bucket is exact
+        buckets.setdefault(tuple(t.text[h]), []).append(h)
+    return {h for same in buckets.values() if len(same) > 1 for h in same}
+
+# Check B works from one correlation matrix. Each column is
+# centered once over its present values, with 0 in its gaps, so
+# a product of two columns is nonzero only where both are
+# present. Pairwise-complete sums then come from dot products of
+# whole columns (d = centered values, q = d*d, m = 1.0 if
+# present), with no per-pair row filtering:
+#
+#     n    = m1.m2        s1 = d1.m2         s2 = d2.m1
+#     Sxy  = d1.d2 - s1*s2/n
+#     Sxx  = q1.m2 - s1*s1/n     Syy = q2.m1 - s2*s2/n
+#
+# For two complete columns s1 = s2 = 0 and this is plain Pearson.
+# With gaps, Sxx subtracts two sums that agree to the last digits
+# when a column's shared rows sit far from its overall mean (in
+# the extreme, a column constant on the rows it shares), so a pair
+# whose Sxx or Syy keeps less than B_STABLE of its q.m sum is
+# recomputed directly from its shared rows, as `pearson` on the
+# pairwise-complete lists (the original per-pair method).
+# d, q and m are float lists (the fastest input for dot), built
+# for about B_CELLS cells at a time (never under B_ROWS rows, so
+# wide tables do not pay the pair loop for tiny blocks): the dot
+# products are summed over row blocks, so memory stays bounded
+# however long the table is. Rows without gaps share one list of
+# ones as m, and a block without any gaps needs no q.
+
+B_CELLS = 1 << 14   # column cells check B holds as float lists at once
+B_ROWS = 1 << 10    # fewest rows per block
+B_STABLE = 1e-6     # least Sxx / q.m kept before a pair is recomputed
+
+def masked_column(t, h, lo, hi, ones, gaps):
+    """(d, d.d, d.1, m, q) for rows lo:hi of column h (q only if `gaps`)."""
+    mu, have = t.moments(h)[0], t.have[h][lo:hi]
+    d = [v - mu if ok else 0.0 for v, ok in zip(t.vals[h][lo:hi], have)]
+    m = ones if all(have) else [float(ok) for ok in have]
+    return d, dot(d, d), dot(d, ones), m, [x * x for x in d] if gaps else None
+
+def block_sums(c1, c2, ones):
+    """(n, s1, s2, d1.d2, q1.m2, q2.m1) of two masked column blocks."""
+    (d1, dd1, s1, m1, q1), (d2, dd2, s2, m2, q2) = c1, c2
+    if m1 is ones and m2 is ones:
+        return len(ones), s1, s2, dot(d1, d2), dd1, dd2
+    return dot(m1, m2), dot(d1, m2), dot(d2, m1), dot(d1, d2), dot(q1, m2), dot(q2, m1)
+
+def pair_r(t, h1, h2, sums, complete):
+    """Pairwise-complete r from summed block_sums (None: no shared rows)."""
+    n, s1, s2, xy, xx, yy = sums
+    if complete:
+        return ratio(xy, xx, yy)
+    if n == 0:
+        return None
+    sxx, syy = xx - s1 * s1 / n, yy - s2 * s2 / n
+    if sxx <= B_STABLE * xx or syy <= B_STABLE * yy:   # cancelled: see above
+        both = bytes(map(and_, t.have[h1], t.have[h2]))
+        return pearson(list(compress(t.vals[h1], both)), list(compress(t.vals[h2], both)))
+    return ratio(xy - s1 * s2 / n, sxx, syy)
+
+def correlations(t, headers):
+    """Pairwise-complete Pearson r for every pair, as {(h1, h2): r}."""
+    pairs = [(h1, h2) for i, h1 in enumerate(headers) for h2 in headers[i + 1:]]
+    sums = {p: (0,) * 6 for p in pairs}
+    step = max(B_ROWS, B_CELLS // max(1, len(headers)))
+    for lo in range(0, t.n, step):
+        hi = min(t.n, lo + step)
+        ones = [1.0] * (hi - lo)
+        gaps = not all(all(memoryview(t.have[h])[lo:hi]) for h in headers)
+        cols = {h: masked_column(t, h, lo, hi, ones, gaps) for h in headers}
+        for p in pairs:
+            sums[p] = tuple(map(add, sums[p], block_sums(cols[p[0]], cols[p[1]], ones)))
+        del cols, ones   # before the next block is built
+    full = {h: all(t.have[h]) for h in headers}
+    return {(h1, h2): pair_r(t, h1, h2, sums[h1, h2], full[h1] and full[h2])
+            for h1, h2 in pairs}
+
+def check_B(t):
     """B: Correlated features — pairs of numeric features with Pearson |r| > 0.95."""
-    headers = [h for h in rows[0].keys() if h != 'class!']
+    headers = [h for h in t.headers if h != CLASS]
     found = set()
-    for i in range(len(headers)):
-        for j in range(i + 1, len(headers)):
-            h1, h2 = headers[i], headers[j]
-            xs, ys = [], []
-            for r in rows:
-                if r[h1] != MISSING and r[h2] != MISSING:
-                    xs.append(float(r[h1]))
-                    ys.append(float(r[h2]))
-            if xs and abs(pearson(xs, ys)) > 0.95:
-                found.update([h1, h2])
-    print_res(found)
-
-def check_C(rows):
+    for (h1, h2), r in correlations(t, headers).items():
+        if r is not None and abs(r) > 0.95:
+            found.update([h1, h2])
+    return found
+
+def check_C(t):
     """C: Outlier features — columns with >=1 value > 3σ from mean."""
-    headers = [h for h in rows[0].keys() if h != 'class!']
+    headers = [h for h in t.headers if h != CLASS]
     found = set()
     for h in headers:
-        vals = [float(r[h]) for r in rows if r[h] != MISSING]
-        if not vals: continue
-        mu, sigma = mean(vals), sd(vals)
+        mu, sigma = t.moments(h)
         if sigma == 0: continue # Cannot have outliers if variance is 0
-        for r in rows:
-            if r[h] != MISSING and abs(float(r[h]) - mu) > 3 * sigma:
-                found.add(h)
-                break
-    print_res(found)
+        if any(abs(v - mu) > 3 * sigma for v in t.present(h)):
+            found.add(h)
+    return found
+
+# ── Rule Table (D, E, J, K) ──────────────────────────────────────
+# D/J (referential integrity) and E/K (plausibility) are one table
+# of rules. Each row: its kind (D = integrity, E = plausibility),
+# the features it implicates, the columns that must all be present
+# for a row to be judged, the columns its test reads (class! is
+# read as text), and the test (true = broken). Every rule runs
+# once per table over whole columns into a row mask; from those
+# same masks D/E report the features of rules broken anywhere and
+# J/K the rows (of D/E rules) set in any mask. A new rule is one
+# line here, no new loop.
+NEEDED = ['HEIGHT','LENGHT','AREA','ECCEN','P_BLACK','P_AND','BLACKPIX','BLACKAND']
+GT_ZERO = ['HEIGHT', 'LENGHT', 'WIDTH', 'AREA', 'BLACKPIX', 'BLACKAND', 'WB_TRANS', 'MEAN_TR', 'ECCEN']
+PROP = ['P_BLACK', 'P_AND']
+
+RULES = [
+    ('D', ['AREA', 'HEIGHT', 'LENGHT'], NEEDED, ['HEIGHT', 'LENGHT', 'AREA'],
+     lambda h, l, a: a != h * l),
+    ('D', ['ECCEN', 'LENGHT', 'HEIGHT'], NEEDED, ['HEIGHT', 'LENGHT', 'ECCEN'],
+     lambda h, l, e: h > 0 and abs(e - l/h) > 0.01),
+    ('D', ['P_BLACK', 'BLACKPIX', 'AREA'], NEEDED, ['AREA', 'P_BLACK', 'BLACKPIX'],
+     lambda a, pb, bpx: a > 0 and abs(pb - bpx/a) > 0.001),
+    ('D', ['P_AND', 'BLACKAND', 'AREA'], NEEDED, ['AREA', 'P_AND', 'BLACKAND'],
+     lambda a, pa, ba: a > 0 and abs(pa - ba/a) > 0.001),
+] + [('E', [h], [h], [h], lambda v: v <= 0) for h in GT_ZERO] \
+  + [('E', [h], [h], [h], lambda v: not (0 <= v <= 1)) for h in PROP] \
+  + [('E', [CLASS], [CLASS], [CLASS], lambda c: c not in VALID)]
+
+def rule_mask(t, needs, reads, test):
+    """1 for each row that is judged and breaks the rule."""
+    scope = t.have[needs[0]]
+    for h in needs[1:]:
+        scope = bytes(map(and_, scope, t.have[h]))
+    cols = [t.label if h == CLASS else t.vals[h] for h in reads]
+    return bytes(ok and test(*v) for ok, v in zip(scope, zip(*cols)))
+
+def rule_masks(t):
+    """[(rule, mask)] for every rule, evaluated once per table."""
+    if 'rules' not in t.memo:
+        t.memo['rules'] = [(r, rule_mask(t, *r[2:])) for r in RULES]
+    return t.memo['rules']
 
-def check_D(rows):
+def rule_features(t, check):
+    return {h for r, mask in rule_masks(t) if r[0] == check and any(mask) for h in r[1]}
+
+def rule_rows(t, check):
+    rows = set()
+    for r, mask in rule_masks(t):
+        if r[0] == check:
+            rows.update(compress(range(t.n), mask))
+    return {i + 2 for i in rows}
+
+def check_D(t):
     """D: Features with conflicting values — referential integrity violations."""
-    found = set()
-    for r in rows:
-        needed = ['HEIGHT','LENGHT','AREA','ECCEN','P_BLACK','P_AND','BLACKPIX','BLACKAND']
-        if any(r[c] == MISSING for c in needed):
-            continue
-            
-        h, l, a, e = float(r['HEIGHT']), float(r['LENGHT']), float(r['AREA']), float(r['ECCEN'])
-        pb, pa = float(r['P_BLACK']), float(r['P_AND'])
-        bpx, ba = float(r['BLACKPIX']), float(r['BLACKAND'])
-
-        if a != h * l: 
-            found.update(['AREA', 'HEIGHT', 'LENGHT'])
-        if h > 0 and abs(e - l/h) > 0.01: 
-            found.update(['ECCEN', 'LENGHT', 'HEIGHT'])
-        if a > 0 and abs(pb - bpx/a) > 0.001: 
-            found.update(['P_BLACK', 'BLACKPIX', 'AREA'])
-        if a > 0 and abs(pa - ba/a) > 0.001: 
-            found.update(['P_AND', 'BLACKAND', 'AREA'])
-    print_res(found)
-
-def check_E(rows):
+    return rule_features(t, 'D')
+
+def check_E(t):
     """E: Features with implausible values."""
-    found = set()
-    gt_zero = ['HEIGHT', 'LENGHT', 'WIDTH', 'AREA', 'BLACKPIX', 'BLACKAND', 'WB_TRANS', 'MEAN_TR', 'ECCEN']
-    prop = ['P_BLACK', 'P_AND']
-    
-    for r in rows:
-        for h in gt_zero:
-            if r[h] != MISSING and float(r[h]) <= 0: 
-                found.add(h)
-        for h in prop:
-            if r[h] != MISSING and not (0 <= float(r[h]) <= 1): 
-                found.add(h)
-        if r['class!'] != MISSING and str(r['class!']) not in ['1','2','3','4','5']: 
-            found.add('class!')
-    print_res(found)
+    return rule_features(t, 'E')
 
 # ── Case-Level Checks (G-K) ──────────────────────────────────────
 
-def check_G(rows):
-    """G: Outlier cases — rows with >=1 value > 3σ from column mean."""
-    headers = [h for h in rows[0].keys() if h != 'class!']
-    stats = {}
-    for h in headers:
-        vals = [float(r[h]) for r in rows if r[h] != MISSING]
-        stats[h] = (mean(vals), sd(vals))
-        
+def outlier_rows(t, headers, c=None):
+    """Rows (of class c, if given) with >=1 value > 3σ from its column mean
+    (over the same rows)."""
+    rows = range(t.n) if c is None else t.classes()[c]
     found = set()
-    for i, r in enumerate(rows):
-        for h in headers:
-            if r[h] != MISSING:
-                mu, sigma = stats[h]
-                if sigma > 0 and abs(float(r[h]) - mu) > 3 * sigma:
-                    found.add(i + 2) # i+2 maps exactly to file line number
-                    break
-    print_res(found)
-
-def check_H(rows):
+    for h in headers:
+        mu, sigma = t.moments(h, c)
+        if sigma > 0:
+            v, have = t.vals[h], t.have[h]
+            found.update(i for i in rows if have[i] and abs(v[i] - mu) > 3 * sigma)
+    return found
+
+def check_G(t):
+    """G: Outlier cases — rows with >=1 value > 3σ from column mean."""
+    headers = [h for h in t.headers if h != CLASS]
+    return {i + 2 for i in outlier_rows(t, headers)} # i+2 maps exactly to file line number
+
+# H compares rows by their feature cells' text, like A. It groups
+# rows by a 128-bit digest of those cells (row_keys), keeping one
+# label per digest, or None once a second label shows up. Only
+# rows of mixed digests are then compared on their actual cells,
+# so a digest collision can never merge two different rows. Past
+# H_BUDGET distinct digests the grouping spills to sorted runs on
+# disk and merges them (spilled_rows).
+H_BUDGET = 1 << 22   # distinct feature rows grouped in memory
+KEY = struct.Struct('<16sII')   # digest, label id, row (spilled)
+
+def row_keys(t, feats):
+    """128-bit digest of each row's feature cells (MISSING included)."""
+    for _, cells in row_cells(t, feats):
+        yield blake2b(SEP.join(cells).encode(), digest_size=16).digest()
+
+def row_cells(t, feats, rows=None):
+    """(i, feature cells as a tuple) for every row, or for the sorted
+    `rows`; each block is unpacked once."""
+    ends = t.starts[1:] + [t.n]
+    for b, lo in enumerate(t.starts):
+        want = range(lo, ends[b]) if rows is None else \
+            rows[bisect_right(rows, lo - 1):bisect_right(rows, ends[b] - 1)]
+        if want:
+            cols = [t.cells(h, b) for h in feats]
+            yield from ((i, tuple(col[i - lo] for col in cols)) for i in want)
+
+def mixed_rows(t, feats, budget=H_BUDGET):
+    """Rows whose digest is shared with a row of another class!."""
+    first = {}
+    for key, c in zip(row_keys(t, feats), t.label):
+        if first.setdefault(key, c) != c:
+            first[key] = None
+        if len(first) > budget:
+            return spilled_rows(t, feats, budget)
+    return [i for i, key in enumerate(row_keys(t, feats)) if first[key] is None]
+
+def spilled_rows(t, feats, budget):
+    """mixed_rows via external sort: runs of `budget` records on disk."""
+    ids, runs, keys = {}, [], enumerate(zip(row_keys(t, feats), t.label))
+    while chunk := list(islice(keys, budget)):
+        runs.append(spill(KEY.pack(k, ids.setdefault(c, len(ids)), i)
+                          for i, (k, c) in chunk))
+    return sorted(i for group in mixed_groups(runs) for _, _, i in group)
+
+def spill(records):
+    """One sorted run of KEY records, in a temp file rewound for reading."""
+    run = tempfile.TemporaryFile()
+    run.write(b''.join(sorted(records)))
+    run.seek(0)
+    return run
+
+def mixed_groups(runs):
+    """Merge sorted runs (closing them); yield [(key, label id, row)] for
+    every digest seen with more than one label."""
+    try:
+        records = heapq.merge(*(iter(partial(run.read, KEY.size), b'') for run in runs))
+        for _, group in groupby(records, key=lambda r: r[:16]):
+            group = [KEY.unpack(r) for r in group]
+            if len({c for _, c, _ in group}) > 1:
+                yield group
+    finally:
+        for run in runs:
+            run.close()
+
+def check_H(t, budget=H_BUDGET):
     """H: Inconsistent cases — rows identical on features but different class!"""
-    headers = [h for h in rows[0].keys() if h != 'class!']
+    headers = [h for h in t.headers if h != CLASS]
+    return inconsistent((cells, t.label[i], i + 2)
+                        for i, cells in row_cells(t, headers, mixed_rows(t, headers, budget)))
+
+def inconsistent(cands):
+    """Row numbers among (cells, label, row) candidates whose exact
+    cells recur with a different label."""
     groups = {}
-    for i, r in enumerate(rows):
-        feats = tuple(r[h] for h in headers)
-        if feats not in groups: 
-            groups[feats] = []
-        groups[feats].append((i + 2, r['class!']))
-        
+    for vals, label, row in cands:
+        groups.setdefault(vals, []).append((label, row))
     found = set()
-    for feats, items in groups.items():
-        classes = set(c for idx, c in items)
-        if len(classes) > 1:
-            for idx, c in items: 
-                found.add(idx)
-    print_res(found)
-
-def check_I(rows):
+    for items in groups.values():
+        if len({label for label, _ in items}) > 1:
+            found.update(row for _, row in items)
+    return found
+
+def check_I(t):
     """I: Class-conditional outlier cases."""
-    headers = [h for h in rows[0].keys() if h != 'class!']
-    valid_classes = set(r['class!'] for r in rows if r['class!'] != MISSING and r['class!'] in ['1','2','3','4','5'])
-    
+    headers = [h for h in t.headers if h != CLASS]
     found = set()
-    for c in valid_classes:
-        c_rows = [(i + 2, r) for i, r in enumerate(rows) if r['class!'] == c]
-        stats = {}
-        for h in headers:
-            vals = [float(r[h]) for idx, r in c_rows if r[h] != MISSING]
-            stats[h] = (mean(vals), sd(vals))
-            
-        for idx, r in c_rows:
-            for h in headers:
-                if r[h] != MISSING:
-                    mu, sigma = stats[h]
-                    if sigma > 0 and abs(float(r[h]) - mu) > 3 * sigma:
-                        found.add(idx)
-                        break
-    print_res(found)
-
-def check_J(rows):
+    for c in t.classes():
+        found.update(i + 2 for i in outlier_rows(t, headers, c))
+    return found
+
+def check_J(t):
     """J: Cases with conflicting values (Referential Integrity)."""
-    found = set()
-    for i, r in enumerate(rows):
-        needed = ['HEIGHT','LENGHT','AREA','ECCEN','P_BLACK','P_AND','BLACKPIX','BLACKAND']
-        if any(r[c] == MISSING for c in needed): 
-            continue
-        
-        h, l, a, e = float(r['HEIGHT']), float(r['LENGHT']), float(r['AREA']), float(r['ECCEN'])
-        pb, pa = float(r['P_BLACK']), float(r['P_AND'])
-        bpx, ba = float(r['BLACKPIX']), float(r['BLACKAND'])
-        
-        if (a != h * l or
-            (h > 0 and abs(e - l/h) > 0.01) or
-            (a > 0 and abs(pb - bpx/a) > 0.001) or
-            (a > 0 and abs(pa - ba/a) > 0.001)):
-            found.add(i + 2)
-    print_res(found)
-
-def check_K(rows):
+    return rule_rows(t, 'D')
+
+def check_K(t):
     """K: Cases with implausible values."""
-    found = set()
-    gt_zero = ['HEIGHT', 'LENGHT', 'WIDTH', 'AREA', 'BLACKPIX', 'BLACKAND', 'WB_TRANS', 'MEAN_TR', 'ECCEN']
-    prop = ['P_BLACK', 'P_AND']
-    
-    for i, r in enumerate(rows):
-        bad = False
-        for h in gt_zero:
-            if r[h] != MISSING and float(r[h]) <= 0: bad = True
-        for h in prop:
-            if r[h] != MISSING and not (0 <= float(r[h]) <= 1): bad = True
-        if r['class!'] != MISSING and str(r['class!']) not in ['1','2','3','4','5']: bad = True
-        
-        if bad: 
-            found.add(i + 2)
-    print_res(found)
+    return rule_rows(t, 'E')
+
+# ── Run Everything ───────────────────────────────────────────────
+# `checks.py all FILE [DIR]` loads once and writes every result to
+# DIR (default out/), plus the unions the Makefile used to build
+# with tail | grep | sort: F (feature problems, sorted as text)
+# and L, M (case problems, sorted as numbers).
+
+DISPATCH = {
+    'A': check_A, 'B': check_B, 'C': check_C, 'D': check_D, 'E': check_E,
+    'G': check_G, 'H': check_H, 'I': check_I, 'J': check_J, 'K': check_K
+}
+UNIONS = {'F': ('ABCDE', None), 'L': ('GHIJK', int), 'M': ('GHIJK', int)}
+
+def run_all(t, outdir='out'):
+    save_all({name: check(t) for name, check in DISPATCH.items()}, outdir)
+
+def save_all(found, outdir='out'):
+    """Write each check's result, then the unions, to outdir."""
+    os.makedirs(outdir, exist_ok=True)
+    for name in DISPATCH:
+        write(outdir, name, format_res(found[name]))
+    for name, (parts, key) in UNIONS.items():
+        items = sorted({str(x) for p in parts for x in found[p]}, key=key)
+        write(outdir, name, ''.join(f"{x}\n" for x in items))
+
+def write(outdir, name, text):
+    with open(os.path.join(outdir, name), 'w') as f:
+        f.write(text)
 
 # ── Dispatcher ───────────────────────────────────────────────────
 if __name__ == "__main__":
     if len(sys.argv) < 3:
         sys.exit(1)
-        
+
     action = sys.argv[1]
     path = sys.argv[2]
-    
-    with open(path, 'r') as f:
-        data = list(csv.DictReader(f))
-        
-    dispatch = {
-        'A': check_A, 'B': check_B, 'C': check_C, 'D': check_D, 'E': check_E,
-        'G': check_G, 'H': check_H, 'I': check_I, 'J': check_J, 'K': check_K
-    }
-    
-    if action in dispatch:
-        dispatch[action](data)
\ No newline at end of file
+
+    if action == 'stream':   # bounded memory, see stream_checks.py
+        import stream_checks
+        save_all(stream_checks.run(path), *sys.argv[3:4])
+        sys.exit(0)
+
+    if action in DISPATCH:
+        sys.stdout.write(format_res(DISPATCH[action](load(path, cells=action in 'AH'))))
+        sys.exit(0)
+
+    import scans   # S1-S5 ride along on the same read, see scans.py
+    scan = scans.Scan()
+    if action == 'scan':
+        with open(path, newline='') as f:
+            for _ in scan.feed(f): pass
+    elif action == 'all':
+        run_all(load(path, scan), *sys.argv[3:4])
+    elif action == 'pool':   # C, G, I on every core, see pool_checks.py
+        import pool_checks
+        save_all(pool_checks.run(load(path, scan)), *sys.argv[3:4])
+    else:
+        sys.exit(1)
+    scan.save(*sys.argv[3:4])
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""grep for the match.py pattern language (c . ^ $ *), over many files.
+
+    python3 grep.py [-n] [-c | -1] [-j N] [-e PAT]... [PAT] FILE...
+
+  -n   prefix each line with its line number
+  -c   print only the count of matching lines per file
+  -1   stop each file at its first matching line
+  -j   worker processes (default: one per CPU; 1 = no pool)
+
+A line matches if any pattern matches it. Files are read in binary blocks
+and each line is matched in place (a memoryview window, see match.py), so
+patterns are matched as their UTF-8 bytes: `café` finds café in a UTF-8
+file, but `.` stands for one byte, and a starred non-ASCII character (`é*`)
+is a usage error. Files fan out over a process pool; results come back in
+command-line order whatever the finishing order. Without the pool (one
+file, or -j 1) lines print as they are found; a pool worker sends back
+each file's matches whole.
+Exit status as grep: 0 some line matched, 1 none did, 2 an error."""
+import os
+import sys
+import argparse
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+import match
+
+BLOCK = 1 << 20   # bytes per read
+
+# ── Reading ──────────────────────────────────────────────────────
+def lines_of(path, block=BLOCK):
+    """Yield (buf, start, end) per line of `path`, newline excluded."""
+    tail = b''
+    with open(path, 'rb') as f:
+        while chunk := f.read(block):
+            buf, start = tail + chunk, 0
+            while (nl := buf.find(b'\n', start)) >= 0:
+                yield buf, start, nl
+                start = nl + 1
+            tail = buf[start:]
+    if tail:
+        yield tail, 0, len(tail)
+
+def byte_pattern(regex):
+    """regex as the byte engine sees it: one character per UTF-8 byte."""
+    for c, nxt in zip(regex, regex[1:] + ' '):
+        if ord(c) > 127 and nxt == '*':
+            raise ValueError(f"{c}*: a star repeats one byte, and {c!r} is "
+                             f"{len(c.encode())} in UTF-8")
+    return regex.encode('utf-8').decode('latin-1')
+
+# ── Searching ────────────────────────────────────────────────────
+def matching_lines(path, patterns, mode='lines'):
+    """Yield (lineno, line) for each matching line of `path` as it is found.
+    `mode` is 'lines' (every match), 'first' or 'count' (line is None)."""
+    compiled = match.PatternSet(patterns)
+    for n, (buf, start, end) in enumerate(lines_of(path), 1):
+        if compiled.match(buf, start, end):
+            yield n, None if mode == 'count' else buf[start:end].decode('utf-8', 'replace')
+            if mode == 'first':
+                return
+
+def search_file(path, patterns, mode='lines'):
+    """One file gathered in a pool worker: (path, count, [(lineno, line)],
+    error); 'count' mode keeps no lines."""
+    count, hits = 0, []
+    try:
+        for hit in matching_lines(path, patterns, mode):
+            count += 1
+            if mode != 'count':
+                hits.append(hit)
+    except OSError as e:
+        return path, count, hits, e.strerror or str(e)
+    return path, count, hits, None
+
+def replay(result):
+    """A search_file result as matching_lines would have yielded it."""
+    _, count, hits, error = result
+    yield from hits or repeat((0, None), count)
+    if error:
+        raise OSError(error)
+
+def grep(patterns, paths, mode='lines', workers=None):
+    """Yield (path, hits) for every path, in the order given: hits yields
+    (lineno, line) and raises OSError if the file cannot be read."""
+    if workers == 1 or len(paths) < 2:
+        for path in paths:
+            yield path, matching_lines(path, patterns, mode)
+        return
+    n, workers = len(paths), workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as pool:
+        yield from ((r[0], replay(r)) for r in
+                    pool.map(search_file, paths, [patterns] * n, [mode] * n,
+                             chunksize=max(1, n // (4 * workers))))
+
+# ── CLI ──────────────────────────────────────────────────────────
+def report(results, numbered, counts, many):
+    """Print results grep-style; return the exit status."""
+    matched = failed = False
+    for path, hits in results:
+        prefix, count = f"{path}:" if many else '', 0
+        try:
+            for n, line in hits:
+                count += 1
+                if not counts:
+                    print(f"{prefix}{n}:{line}" if numbered else f"{prefix}{line}")
+        except OSError as e:
+            print(f"grep.py: {path}: {e.strerror or e}", file=sys.stderr)
+            failed = True
+            continue
+        matched = matched or count > 0
+        if counts:
+            print(f"{prefix}{count}")
+    return 2 if failed else 0 if matched else 1
+
+def main(argv):
+    ap = argparse.ArgumentParser(usage=__doc__.splitlines()[2].strip())
+    ap.add_argument('-n', action='store_true')
+    ap.add_argument('-c', action='store_true')
+    ap.add_argument('-1', dest='first', action='store_true')
+    ap.add_argument('-j', type=int, default=None)
+    ap.add_argument('-e', action='append', default=[])
+    ap.add_argument('args', nargs='+')
+    a = ap.parse_args(argv)
+    patterns, paths = (a.e, a.args) if a.e else (a.args[:1], a.args[1:])
+    if not paths:
+        ap.error('no files given')
+    try:
+        patterns = [byte_pattern(p) for p in patterns]
+    except ValueError as e:
+        ap.error(str(e))
+    mode = 'count' if a.c else 'first' if a.first else 'lines'
+    return report(grep(patterns, paths, mode, a.j), a.n, a.c, len(paths) > 1)
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
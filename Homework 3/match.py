@@ -11,6 +11,11 @@
 # - `$`     : end of string     
 # - `*`     : zero or more of previous     
 #     
+# Below the original backtracker sits a compiled engine
+# (Thompson NFA run as a lazy DFA) with the same syntax and
+# results but a linear-time guarantee; `match` uses it,
+# through a cache of compiled patterns.
+#
 # ## The Top-Level Match
 #
 # If the pattern starts with `^`, we anchor and try only
@@ -18,53 +23,429 @@
 # trying `matchhere` at every starting position.
 
 def match(regex, text):
+    return compile(regex).match(text)
+
+def backtrack(regex, text):
     if regex and regex[0] == '^':
-        return matchhere(regex[1:], text)
+        return matchhere(regex, 1, text, 0)
     # try every starting position (including empty text)
     for i in range(len(text) + 1):
-        if matchhere(regex, text[i:]):
+        if matchhere(regex, 0, text, i):
             return True
     return False
 
-# ## The Recursive Core
+# ## The Core, On Offsets
 #
-# `matchhere` asks: does `regex` match at exactly this
-# point in `text`?  Three cases:
+# `matchhere(regex, r, text, t)` asks: does `regex[r:]` match
+# at exactly `text[t:]`? The book version passes slices
+# (`regex[1:]`, `text[1:]`), copying the rest of the text on
+# every step; here the two offsets walk the original strings
+# and nothing is copied. Four cases:
 #
-# 1. **Empty pattern** — always matches.
+# 1. **End of pattern** — always matches.
 # 2. **`c*` pair** — hand off to `matchstar`.
-# 3. **`$` at end of pattern** — matches only if text is empty.
-# 4. **Literal or `.`** — consume one character and recurse.
-
-def matchhere(regex, text):
-    if not regex:
-        return True
-    if len(regex) >= 2 and regex[1] == '*':
-        return matchstar(regex[0], regex[2:], text)
-    if regex == '$':
-        return text == ''
-    if text and (regex[0] == '.' or regex[0] == text[0]):
-        return matchhere(regex[1:], text[1:])
-    return False
+# 3. **`$` at end of pattern** — matches only at end of text.
+# 4. **Literal or `.`** — consume one character and loop.
+#
+# Case 4 loops instead of recursing, so the only recursion is
+# one `matchstar` frame per `*` in the pattern, however long
+# the text is.
+
+def matchhere(regex, r, text, t):
+    while True:
+        if r == len(regex):
+            return True
+        if r + 1 < len(regex) and regex[r + 1] == '*':
+            return matchstar(regex[r], regex, r + 2, text, t)
+        if r == len(regex) - 1 and regex[r] == '$':
+            return t == len(text)
+        if t < len(text) and (regex[r] == '.' or regex[r] == text[t]):
+            r, t = r + 1, t + 1
+        else:
+            return False
 
 # ## The Star Operator
 #
-# `matchstar(c, regex, text)` matches `c*` followed by `regex`.
-# It tries the **shortest match first** — zero characters,
-# then one, then two, etc. This is simple but correct;
-# a production engine would use backtracking or an NFA.
+# `matchstar(c, regex, r, text, t)` matches `c*` followed by
+# `regex[r:]`. It tries the **shortest match first** — zero
+# characters, then one, then two, etc. This is simple but
+# correct; it is also where the retries come from.
 
-def matchstar(c, regex, text):
+def matchstar(c, regex, r, text, t):
     # try matching zero, then one, then two...
-    i = 0
     while True:
-        if matchhere(regex, text[i:]):
+        if matchhere(regex, r, text, t):
             return True
-        if i < len(text) and (c == '.' or c == text[i]):
-            i += 1
+        if t < len(text) and (c == '.' or c == text[t]):
+            t += 1
         else:
             return False
 
+# ## Why Backtracking Hurts
+#
+# Each `*` tries every count, and each failed count retries
+# everything after it. `a*a*a*a*b` against a long run of `a`
+# is polynomial in the text length (one nested loop per star).
+# The engine below reads each character of the text exactly
+# once.
+#
+# ## Parsing
+#
+# `parse` turns the pattern into a flat token list, using the
+# same rules as `matchhere` above: `^` is special only as the
+# first character, `c*` is checked before anything else, and
+# `$` is special only as the very last character. A token is
+# `(c, starred)`, with `c = None` standing for `.`.
+
+def parse(regex):
+    anchored = regex[:1] == '^'
+    i, tokens, at_end = int(anchored), [], False
+    while i < len(regex):
+        if i + 1 < len(regex) and regex[i + 1] == '*':
+            tokens.append((None if regex[i] == '.' else regex[i], True))
+            i += 2
+        elif regex[i] == '$' and i == len(regex) - 1:
+            at_end, i = True, i + 1
+        else:
+            tokens.append((None if regex[i] == '.' else regex[i], False))
+            i += 1
+    return anchored, tokens, at_end
+
+# ## The Thompson NFA
+#
+# NFA state `k` means "the first `k` tokens have matched";
+# state `len(tokens)` accepts. A starred token loops on state
+# `k` and may also be skipped for free, so the epsilon
+# closure of `k` runs forward over consecutive starred tokens.
+# Instead of trying one path at a time we track the *set* of
+# states all paths could be in: one set per text position.
+
+# ## The Lazy DFA
+#
+# Each distinct set of NFA states becomes one DFA state, built
+# only when the text first leads there, and each
+# `(state, character)` transition is cached once computed. After
+# warm-up a text character costs one dict lookup. An unanchored
+# pattern re-enters NFA state 0 at every position, which is the
+# NFA form of "try every starting offset" without the retries.
+#
+# A DFA can have exponentially many states, so the cache is
+# capped at `MAX_STATES` and simply flushed when full (as RE2
+# does). The worst case is then O(len(text) * len(regex));
+# typical patterns stay at O(len(text)).
+
+MAX_STATES = 4096
+
+class Dfa:
+    def __init__(self, regex, binary=False):
+        self.anchored, self.tokens, self.at_end = parse(regex)
+        if binary:
+            self.tokens = [(None if c is None else latin1(c), starred)
+                           for c, starred in self.tokens]
+        self.final = len(self.tokens)
+        self.flush()
+
+    def flush(self):
+        self.ids, self.sets, self.moves = {}, [], []
+        self.accept, self.stop = [], []
+        self.start = self.state(self.closure({0}))
+
+    def closure(self, states):
+        out = set()
+        for k in states:
+            out.add(k)
+            while k < self.final and self.tokens[k][1]:
+                k += 1
+                out.add(k)
+        return frozenset(out)
+
+    # Interning gives every distinct state set a small integer
+    # id. `stop` marks states whose answer can no longer change:
+    # dead (anchored, nothing left alive), or accepting when no
+    # `$` forces us to read to the end.
+
+    def state(self, nfa):
+        sid = self.ids.get(nfa)
+        if sid is None:
+            sid = self.ids[nfa] = len(self.sets)
+            self.sets.append(nfa)
+            self.moves.append({})
+            self.accept.append(self.final in nfa)
+            self.stop.append(not nfa or (self.final in nfa and not self.at_end))
+        return sid
+
+    def step(self, sid, ch):
+        nxt = {0} if not self.anchored else set()
+        for k in self.sets[sid]:
+            if k < self.final:
+                c, starred = self.tokens[k]
+                if c is None or c == ch:
+                    nxt.add(k if starred else k + 1)
+        nxt = self.closure(nxt)
+        if len(self.sets) >= MAX_STATES:
+            self.flush()
+            return self.state(nxt)
+        tid = self.moves[sid][ch] = self.state(nxt)
+        return tid
+
+    # The hot loop: one cached transition per character, with
+    # locals refreshed whenever `step` may have flushed the cache.
+    # `text` is any iterable of characters (or of byte values for
+    # a binary DFA); the loop never indexes or slices it.
+
+    def search(self, text):
+        sid = self.start
+        moves, stop = self.moves, self.stop
+        for ch in text:
+            if stop[sid]:
+                break
+            nxt = moves[sid].get(ch)
+            if nxt is None:
+                nxt = self.step(sid, ch)
+                moves, stop = self.moves, self.stop
+            sid = nxt
+        return self.accept[sid]
+
+# ## Bytes Input
+#
+# Iterating `bytes` or a `memoryview` yields ints, so a binary
+# DFA compares tokens as byte values: each pattern character
+# must be a single byte (Latin-1), and `.` matches one byte.
+# A `memoryview` slice is a window onto the same buffer, so a
+# line inside a large read buffer is matched without copying.
+
+def latin1(c):
+    if ord(c) > 255:
+        raise ValueError(f"{c!r} is not a single byte")
+    return ord(c)
+
+# ## Literal Prefilter
+#
+# Most patterns contain a run of plain characters, and every
+# match must contain that run. `required` picks the longest
+# such run (no `.`, no `*`) and `lead`, the fixed number of
+# characters before it (`None` if a `*` comes first). Before any
+# DFA work, `str.find` / `bytes.find` (C speed) looks for the
+# run: no run, no match. For an unanchored pattern, no match
+# can start earlier than `lead` characters before the first
+# run, so the DFA jumps straight there.
+
+def required(tokens):
+    best, lead, run = '', None, ''
+    for k, (c, starred) in enumerate(tokens + [(None, False)]):
+        if c is not None and not starred:
+            run += c
+            continue
+        if len(run) > len(best):
+            first = k - len(run)
+            best = run
+            fixed = not any(st for _, st in tokens[:first])
+            lead = first if fixed else None
+        run = ''
+    return best, lead
+
+# ## Compiled Patterns
+#
+# `compile(regex)` returns a `Pattern` whose DFA (and every
+# transition it has learned) is reused across calls, so one
+# pattern applied to a million lines is parsed once and warms
+# up once:
+#
+#     p = compile('^err.*disk')
+#     p.match(line)                  # -> bool
+#     p.match(buf, pos, endpos)      # buf[pos:endpos], no copy
+#     for n, line in p.search_many(open('log')): ...
+#
+# Compiled patterns live in a bounded LRU cache keyed by the
+# pattern string, so plain `match(regex, text)` calls with a
+# repeated pattern get the same benefit. `cache_stats()` reports
+# hits, misses and evictions.
+
+from collections import OrderedDict, deque
+from itertools import islice
+
+CACHE_SIZE = 256
+
+class Pattern:
+    def __init__(self, regex):
+        self.regex, self.dfa, self.bdfa = regex, Dfa(regex), None
+        self.literal, self.lead = required(self.dfa.tokens)
+        self.bliteral = None
+
+    # `pos`/`endpos` bound the match like `re`: `^` anchors at
+    # `pos` and `$` at `endpos`. A str window is walked with
+    # `islice`, a bytes-like one through a memoryview slice.
+    def match(self, text, pos=0, endpos=None):
+        end = len(text) if endpos is None else min(endpos, len(text))
+        if isinstance(text, str):
+            start = self.skip(text, self.literal, pos, end)
+            if start < 0:
+                return False
+            return self.dfa.search(islice(text, start, end) if start or end < len(text)
+                                   else text)
+        if self.bdfa is None:
+            self.bdfa = Dfa(self.regex, binary=True)
+            self.bliteral = bytes(latin1(c) for c in self.literal)
+        start = self.skip(text, self.bliteral, pos, end)
+        return start >= 0 and self.bdfa.search(memoryview(text).cast('B')[start:end])
+
+    # `skip` returns where to start the DFA, or -1 when the text
+    # cannot match. A `memoryview` has no `find`, so it is
+    # scanned in full.
+    def skip(self, text, literal, pos, end):
+        if not literal or not hasattr(text, 'find'):
+            return pos
+        i = text.find(literal, pos, end)
+        if i < 0:
+            return -1
+        if self.dfa.anchored or self.lead is None:
+            return pos
+        return max(pos, i - self.lead)
+
+    # yields `(line_number, line)` for every matching line,
+    # numbering from 1 like grep (lines keep their newline)
+    def search_many(self, lines):
+        for n, line in enumerate(lines, 1):
+            if self.match(line):
+                yield n, line
+
+    def __repr__(self):
+        return f"compile({self.regex!r})"
+
+_cache = OrderedDict()
+_stats = dict(hits=0, misses=0, evictions=0)
+
+def compile(regex):
+    pattern = _cache.get(regex)
+    if pattern is not None:
+        _stats["hits"] += 1
+        _cache.move_to_end(regex)
+        return pattern
+    _stats["misses"] += 1
+    pattern = _cache[regex] = Pattern(regex)
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+        _stats["evictions"] += 1
+    return pattern
+
+def cache_stats():
+    return dict(_stats, size=len(_cache), maxsize=CACHE_SIZE)
+
+def purge():
+    _cache.clear()
+    _stats.update(hits=0, misses=0, evictions=0)
+
+# ## Many Patterns at Once
+#
+# Checking `n` patterns one by one reads each text `n` times.
+# A `PatternSet` instead finds, in **one pass**, which required
+# literals occur, using an Aho-Corasick automaton: a trie of all
+# the literals whose failure links say where to continue after
+# a mismatch, so the text is never re-read. Only patterns whose
+# literal occurred (or that have none) run their DFA. Patterns
+# sharing a literal share its search. With only a few distinct
+# literals, `find` per literal is faster in Python than a
+# per-character automaton, so the automaton is used from
+# `AC_MIN` literals up.
+#
+#     ps = PatternSet(['ERROR.*disk', 'WARN.*slow', 'panic'])
+#     ps.matches(line)      # -> indices of matching patterns
+#     ps.match(line)        # -> any of them?
+
+AC_MIN = 8
+
+class AhoCorasick:
+    def __init__(self, words):
+        self.goto, self.fail, self.out = [{}], [0], [set()]
+        for i, word in enumerate(words):
+            s = 0
+            for ch in word:
+                if ch not in self.goto[s]:
+                    self.goto[s][ch] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(set())
+                s = self.goto[s][ch]
+            self.out[s].add(i)
+        self.links()
+
+    # breadth-first, so a state's failure target (a shorter
+    # suffix) is always finished before the state itself
+    def links(self):
+        todo = deque(self.goto[0].values())
+        while todo:
+            s = todo.popleft()
+            for ch, t in self.goto[s].items():
+                f = self.fail[s]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[t] = self.goto[f].get(ch, 0)
+                self.out[t] |= self.out[self.fail[t]]
+                todo.append(t)
+
+    def scan(self, text):
+        goto, fail, out = self.goto, self.fail, self.out
+        s, found = 0, set()
+        for ch in text:
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            if out[s]:
+                found |= out[s]
+        return found
+
+class PatternSet:
+    def __init__(self, regexes):
+        self.patterns = [compile(r) for r in regexes]
+        self.free, self.users = [], {}   # users: literal -> pattern indices
+        for i, p in enumerate(self.patterns):
+            if p.literal:
+                self.users.setdefault(p.literal, []).append(i)
+            else:
+                self.free.append(i)
+        self.literals = list(self.users)
+        self.ac = self.blits = self.bac = None
+        if len(self.literals) >= AC_MIN:
+            self.ac = AhoCorasick(self.literals)
+
+    # The byte literals (and their automaton) are built on the
+    # first bytes input, as `Pattern.match` builds its byte DFA:
+    # a set used only on str may hold characters above 255.
+    def binary(self):
+        self.blits = [bytes(latin1(c) for c in lit) for lit in self.literals]
+        if self.ac is not None:
+            self.bac = AhoCorasick(self.blits)
+
+    # which literals occur in text[pos:end]? A memoryview has no
+    # `find`, so without an automaton all of them are assumed.
+    def found(self, text, pos, end):
+        if isinstance(text, str):
+            lits, ac, window = self.literals, self.ac, islice(text, pos, end)
+        else:
+            if self.blits is None:
+                self.binary()
+            lits, ac = self.blits, self.bac
+            window = memoryview(text).cast('B')[pos:end]
+        if ac is not None:
+            return ac.scan(window)
+        if not hasattr(text, 'find'):
+            return range(len(lits))
+        return [j for j, lit in enumerate(lits) if text.find(lit, pos, end) >= 0]
+
+    def candidates(self, text, pos, end):
+        found = self.found(text, pos, end)
+        return sorted(self.free + [i for j in found for i in self.users[self.literals[j]]])
+
+    def matches(self, text, pos=0, endpos=None):
+        end = len(text) if endpos is None else min(endpos, len(text))
+        return [i for i in self.candidates(text, pos, end)
+                if self.patterns[i].match(text, pos, endpos)]
+
+    def match(self, text, pos=0, endpos=None):
+        end = len(text) if endpos is None else min(endpos, len(text))
+        return any(self.patterns[i].match(text, pos, endpos)
+                   for i in self.candidates(text, pos, end))
+
 # ## Demo
 #
 # A few quick tests to show it works.
@@ -84,5 +465,9 @@ if __name__ == '__main__':
     ]
     for pat, txt, expected in tests:
         result = match(pat, txt)
-        ok = 'ok' if result == expected else 'FAIL'
+        same = backtrack(pat, txt) == match(pat, txt.encode()) == expected
+        ok = 'ok' if result == expected and same else 'FAIL'
         print(f"  {ok}  match({pat!r:10s}, {txt!r:10s}) = {result}")
+    # linear time: hopeless for the backtracker, instant here
+    print(f"  a*a*a*a*b vs 10^6 a's = {match('a*a*a*a*b', 'a' * 10**6)}")
+    print(f"  cache: {cache_stats()}")
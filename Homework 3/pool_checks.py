@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Checks C, G and I on a process pool.
+
+    python3 checks.py pool FILE [DIR]   # same out/ files as `checks.py all`
+
+All three are 3σ tests: per column (C, G) or per class and column (I).
+Every (column, class) pair is independent, so each becomes one task.
+The parent loads the table once and copies its columns into a single
+shared-memory block:
+
+    [ vals: features x n doubles | have: features x n bytes | class: n bytes ]
+
+Workers attach to that block by name and read the columns in place
+through memoryviews; a task sends only (column, class) in and row
+numbers out. pool.map returns results in task order, and the merge is
+a set union, so the output never depends on which worker finished first.
+
+Workers compute mean/sd exactly as Table.moments does, so the results are
+identical to the serial checks."""
+import os
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress
+import checks
+from checks import CLASS, VALID, mean, sd
+
+LABELS = sorted(VALID)   # class code k + 1 in the shared block; 0 = other
+
+# ── Shared Columns ───────────────────────────────────────────────
+def share(t, feats):
+    """Copy the feature columns and class codes of t into shared memory."""
+    n, k = t.n, len(feats)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, 9 * n * k + n))
+    for j, h in enumerate(feats):
+        shm.buf[8 * n * j:8 * n * (j + 1)] = memoryview(t.vals[h]).cast('B')
+        shm.buf[8 * n * k + n * j:8 * n * k + n * (j + 1)] = t.have[h]
+    shm.buf[9 * n * k:9 * n * k + n] = bytes(
+        LABELS.index(c) + 1 if c in VALID else 0 for c in t.label)
+    return shm
+
+SHM, COLS, ROWS = None, {}, {}   # per worker: block; h -> (vals, have); class -> rows
+
+def attach(name, feats, n):
+    """Pool initializer: view the parent's block without copying it."""
+    global SHM
+    SHM = shared_memory.SharedMemory(name=name)
+    buf, k = SHM.buf, len(feats)
+    for j, h in enumerate(feats):
+        COLS[h] = (buf[8 * n * j:8 * n * (j + 1)].cast('d'),
+                   buf[8 * n * k + n * j:8 * n * k + n * (j + 1)])
+    ROWS['codes'] = buf[9 * n * k:9 * n * k + n]
+
+def class_rows(c):
+    if c not in ROWS:
+        code = LABELS.index(c) + 1
+        ROWS[c] = [i for i, x in enumerate(ROWS['codes']) if x == code]
+    return ROWS[c]
+
+# ── Tasks ────────────────────────────────────────────────────────
+def scan(task):
+    """Rows of column h (within class c, if given) > 3σ from their mean."""
+    h, c = task
+    v, have = COLS[h]   # read in place: only the rows visited are unboxed
+    if c is None:
+        rows, xs = range(len(v)), list(compress(v, have))
+    else:
+        rows = class_rows(c)
+        xs = [v[i] for i in rows if have[i]]
+    mu, sigma = mean(xs), sd(xs)
+    if sigma == 0: return []
+    return [i for i in rows if have[i] and abs(v[i] - mu) > 3 * sigma]
+
+def outliers(t, workers=None):
+    """{'C', 'G', 'I'} results for table t, fanned out over `workers`."""
+    feats = [h for h in t.headers if h != CLASS]
+    tasks = [(h, c) for c in [None] + sorted(t.classes()) for h in feats]
+    workers = workers or os.cpu_count() or 1
+    shm = share(t, feats)
+    try:
+        with ProcessPoolExecutor(workers, initializer=attach,
+                                 initargs=(shm.name, feats, t.n)) as pool:
+            results = list(pool.map(scan, tasks,
+                                    chunksize=max(1, len(tasks) // (4 * workers))))
+    finally:
+        shm.close()
+        shm.unlink()
+    found = {'C': set(), 'G': set(), 'I': set()}
+    for (h, c), rows in zip(tasks, results):
+        if c is None and rows: found['C'].add(h)
+        found['G' if c is None else 'I'].update(i + 2 for i in rows)
+    return found
+
+def run(t, workers=None):
+    """Every check A-K; C, G and I on the pool, the rest in-process."""
+    found = outliers(t, workers)
+    found.update({name: check(t) for name, check in checks.DISPATCH.items()
+                  if name not in found})
+    return found
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Structural scans S1-S5 (the old S*.awk), in the loader's read.
+
+    python3 checks.py all FILE [DIR]    # also writes DIR/S1 .. DIR/S5
+    python3 checks.py scan FILE [DIR]   # only S1-S5
+
+Scan.feed passes the file's lines through to csv.reader unchanged and
+looks at each one on the way, so the table and S1-S5 come from a single
+read. Lines are split on every comma, as awk's FS = "," does, and each
+file is byte-for-byte what `gawk -f Sx.awk` printed:
+
+  S1  line numbers whose field count differs from the header's
+  S2  "col: NAME" for every column with a ? cell (sorted: awk's
+      for-in order is unspecified), then "row: NR" for every such row
+  S3  columns whose value never changes after line 2 (compared as
+      numbers when both sides look numeric, as awk does)
+  S4  line numbers whose last field is not one of 1-5
+  S5  line numbers of exact repeats of an earlier line
+
+Each scan's count goes to stderr, as the awk END blocks did."""
+import os
+import re
+import sys
+import checks
+
+NUMBER = re.compile(r'\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*')
+
+def awk_equal(a, b):
+    """a == b for two awk fields (strnum: numeric if both look numeric)."""
+    if NUMBER.fullmatch(a) and NUMBER.fullmatch(b):
+        return float(a) == float(b)
+    return a == b
+
+class Scan:
+    def __init__(self):
+        self.headers, self.first, self.same = [], [], set()
+        self.rows = {name: [] for name in ('S1', 'S2', 'S4', 'S5')}
+        self.cols, self.seen = set(), set()
+
+    def feed(self, lines):
+        """Yield `lines` unchanged, scanning each one."""
+        for nr, line in enumerate(lines, 1):
+            self.line(nr, line[:-1] if line.endswith('\n') else line)
+            yield line
+
+    def line(self, nr, text):
+        fields = text.split(',') if text else []   # awk: NF = 0 on an empty line
+        if nr == 1:
+            self.headers = fields
+            return
+        if len(fields) != len(self.headers):
+            self.rows['S1'].append(nr)
+        if '?' in fields:
+            self.cols.update(self.name(i) for i, x in enumerate(fields) if x == '?')
+            self.rows['S2'].append(nr)
+        if nr == 2:
+            self.first, self.same = fields, set(range(len(fields)))
+        elif self.same:
+            self.same = {i for i in self.same
+                         if awk_equal(fields[i] if i < len(fields) else '', self.first[i])}
+        last = fields[-1] if fields else ''
+        if not (len(last) == 1 and last in '12345'):
+            self.rows['S4'].append(nr)
+        if text in self.seen:
+            self.rows['S5'].append(nr)
+        self.seen.add(text)
+
+    def name(self, i):
+        return self.headers[i] if i < len(self.headers) else ''
+
+    def results(self):
+        """{name: (text, count)}, count being what awk sent to stderr."""
+        s2 = [f"col: {c}" for c in sorted(self.cols)] + [f"row: {nr}" for nr in self.rows['S2']]
+        s3 = [h for i, h in enumerate(self.headers) if i in self.same]
+        out = {name: (self.rows[name], len(self.rows[name])) for name in ('S1', 'S4', 'S5')}
+        out.update(S2=(s2, len(self.rows['S2'])), S3=(s3, len(s3)))
+        return {name: (''.join(f"{x}\n" for x in lines), n)
+                for name, (lines, n) in sorted(out.items())}
+
+    def save(self, outdir='out'):
+        os.makedirs(outdir, exist_ok=True)
+        for name, (text, n) in self.results().items():
+            checks.write(outdir, name, text)
+            print(f"{name}: {n}", file=sys.stderr)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""Bounded-memory checks A-K for files larger than RAM.
+
+    python3 checks.py stream FILE [DIR]   # same out/ files as `checks.py all`
+
+The file is read twice, BLOCK rows at a time (each block is a small
+checks.Table), and never held whole:
+
+  pass 1  running mean/variance per column (C, G) and per class and
+          column (I), merged block by block with Chan's update of
+          Welford's method; a co-moment accumulator per column pair (B);
+          a digest per column (A) and per row's features (H); and the
+          row-local rules D, E, J, K.
+  pass 2  3σ tests against the pass-1 statistics (C, G, I), exact
+          comparison of same-digest columns (A), and the rows of every H
+          group that saw more than one class.
+
+Memory: O(BLOCK x columns + columns^2 + classes x columns), plus for H
+at most checks.H_BUDGET (16-byte key, label id) entries: past that they
+are flushed to sorted runs on disk (checks.spill) and merged after pass
+1, as check_H does. Pass 2 keeps the exact cells of the rows whose key
+saw two labels, and H is decided on those cells, so a digest collision
+cannot merge different rows. Plus the results themselves.
+
+Tolerance: running means, variances and co-moments agree with the
+two-pass sums of checks.py to about 1e-12 relative. A value within that
+margin of a 3σ cut, or an |r| within it of 0.95, can be classified
+differently; otherwise the results are identical."""
+import csv
+import math
+from hashlib import blake2b
+from operator import and_
+from itertools import compress, islice
+import checks
+from checks import CLASS, mean, dot, centered, row_keys
+
+MIXED = (0xFFFFFFFE, 0xFFFFFFFF)   # label ids of a spilled -1 key
+
+# ── Running Statistics ───────────────────────────────────────────
+class Moments:
+    """n, mean and M2 (sum of squared deviations) of a stream."""
+    def __init__(self):
+        self.n, self.mu, self.m2 = 0, 0.0, 0.0
+
+    def add(self, xs):
+        """Merge a whole block of values (Chan et al.)."""
+        if not xs: return
+        nb, mb, d = len(xs), mean(xs), centered(xs)
+        m2b = dot(d, d)
+        n = self.n + nb
+        e = mb - self.mu
+        self.mu += e * nb / n
+        self.m2 += m2b + e * e * self.n * nb / n
+        self.n = n
+
+    def sd(self):
+        return math.sqrt(self.m2 / self.n) if self.n else 0.0
+
+class CoMoments:
+    """Pairwise-complete running Pearson for one column pair."""
+    def __init__(self):
+        self.n, self.mx, self.my = 0, 0.0, 0.0
+        self.sxx = self.syy = self.sxy = 0.0
+
+    def add(self, xs, ys):
+        if not xs: return
+        nb, mxb, myb = len(xs), mean(xs), mean(ys)
+        dx, dy = centered(xs), centered(ys)
+        n, ex, ey = self.n + nb, mxb - self.mx, myb - self.my
+        w = self.n * nb / n
+        self.sxx += dot(dx, dx) + ex * ex * w
+        self.syy += dot(dy, dy) + ey * ey * w
+        self.sxy += dot(dx, dy) + ex * ey * w
+        self.mx += ex * nb / n
+        self.my += ey * nb / n
+        self.n = n
+
+    def r(self):
+        return checks.ratio(self.sxy, self.sxx, self.syy) if self.n else None
+
+# ── Reading ──────────────────────────────────────────────────────
+def blocks(path, size=checks.BLOCK):
+    """Yield (offset, Table) for consecutive blocks of rows."""
+    with open(path, newline='') as f:
+        rd = csv.reader(f)
+        headers, offset = next(rd), 0
+        while block := [r for r in islice(rd, size) if r]:
+            t = checks.Table(headers)
+            t.add(block)
+            yield offset, t
+            offset += t.n
+
+# ── The Two Passes ───────────────────────────────────────────────
+class State:
+    def __init__(self, headers, budget=checks.H_BUDGET):
+        self.headers, self.budget = headers, budget
+        self.feats = [h for h in headers if h != CLASS]
+        self.col = {h: Moments() for h in self.feats}
+        self.cls = {}                               # class -> {h: Moments}
+        self.pair = {(h1, h2): CoMoments() for i, h1 in enumerate(self.feats)
+                     for h2 in self.feats[i + 1:]}
+        self.digest = {h: blake2b(digest_size=16) for h in headers}
+        self.groups, self.labels = {}, {}           # H: row key -> label id / -1
+        self.runs, self.cands = [], []              # H: spilled runs; pass-2 rows
+        self.found = {x: set() for x in checks.DISPATCH}
+
+    # ── Pass 1 ───────────────────────────────────────────────────
+    def first(self, offset, t):
+        for h in self.feats:
+            self.col[h].add(t.present(h))
+        for c, rows in t.classes().items():
+            stats = self.cls.setdefault(c, {h: Moments() for h in self.feats})
+            for h in self.feats:
+                stats[h].add(t.present(h, rows))
+        for (h1, h2), acc in self.pair.items():
+            both = bytes(map(and_, t.have[h1], t.have[h2]))
+            acc.add(list(compress(t.vals[h1], both)), list(compress(t.vals[h2], both)))
+        for h in self.headers:
+            self.digest[h].update(t.digest(h))
+        self.group(t)
+        self.local(offset, t)
+
+    def group(self, t):
+        """H: remember one label per row key, or -1 once two differ."""
+        for key, label in zip(row_keys(t, self.feats), t.label):
+            lid = self.labels.setdefault(label, len(self.labels))
+            if self.groups.setdefault(key, lid) != lid:
+                self.groups[key] = -1
+            if len(self.groups) > self.budget:
+                self.flush()
+
+    def flush(self):
+        """Spill the H groups as one sorted run. A -1 key is written under
+        two made-up label ids, so the merge still sees it as mixed."""
+        self.runs.append(checks.spill(checks.KEY.pack(key, lid, 0)
+                                      for key, got in self.groups.items()
+                                      for lid in ((got,) if got >= 0 else MIXED)))
+        self.groups = {}
+
+    def local(self, offset, t):
+        """D, E, J, K only look at one row at a time."""
+        f = self.found
+        f['D'] |= checks.check_D(t)
+        f['E'] |= checks.check_E(t)
+        f['J'].update(offset + i for i in checks.check_J(t))
+        f['K'].update(offset + i for i in checks.check_K(t))
+
+    def between(self):
+        """After pass 1: B from the co-moments, A candidates by digest,
+        H candidates: the keys that saw two labels."""
+        self.found['B'] = {h for (h1, h2), acc in self.pair.items()
+                           if (r := acc.r()) is not None and abs(r) > 0.95
+                           for h in (h1, h2)}
+        buckets = {}
+        for h in self.headers:
+            buckets.setdefault(self.digest[h].digest(), []).append(h)
+        self.same = {(h1, h2): True for hs in buckets.values()
+                     for i, h1 in enumerate(hs) for h2 in hs[i + 1:]}
+        if self.runs:
+            self.flush()
+            self.mixed = {group[0][0] for group in checks.mixed_groups(self.runs)}
+        else:
+            self.mixed = {key for key, got in self.groups.items() if got == -1}
+        self.groups = None
+
+    # ── Pass 2 ───────────────────────────────────────────────────
+    def second(self, offset, t):
+        f = self.found
+        for h in self.feats:
+            mu, sigma = self.col[h].mu, self.col[h].sd()
+            rows = outliers(t, h, range(t.n), mu, sigma)
+            if rows: f['C'].add(h)
+            f['G'].update(offset + i + 2 for i in rows)
+        for c, rows in t.classes().items():
+            for h in self.feats:
+                m = self.cls[c][h]
+                f['I'].update(offset + i + 2 for i in outliers(t, h, rows, m.mu, m.sd()))
+        for h1, h2 in self.same:
+            if not t.same(h1, h2):
+                self.same[h1, h2] = False
+        rows = [i for i, key in enumerate(row_keys(t, self.feats)) if key in self.mixed]
+        self.cands += [(cells, t.label[i], offset + i + 2)
+                       for i, cells in checks.row_cells(t, self.feats, rows)]
+
+    def finish(self):
+        self.found['A'] = {h for pair, ok in self.same.items() if ok for h in pair}
+        self.found['H'] = checks.inconsistent(self.cands)
+        return self.found
+
+def outliers(t, h, rows, mu, sigma):
+    if sigma == 0: return []
+    v, have = t.vals[h], t.have[h]
+    return [i for i in rows if have[i] and abs(v[i] - mu) > 3 * sigma]
+
+def run(path, budget=checks.H_BUDGET, size=checks.BLOCK):
+    """Every check A-K in two bounded-memory passes of `size`-row blocks;
+    {name: found set}."""
+    with open(path, newline='') as f:
+        state = State(next(csv.reader(f)), budget)
+    for offset, t in blocks(path, size):
+        state.first(offset, t)
+    state.between()
+    for offset, t in blocks(path, size):
+        state.second(offset, t)
+    return state.finish()